@@ -133,17 +133,18 @@ def trigger_hf_pipeline():
     import subprocess
     import sys
 
-    env = {
-        **os.environ,
-        "HF_DATASET_REPO": HF_DATASET_REPO,
-        "HF_MODEL_REPO": HF_MODEL_REPO,
-        "WANDB_PROJECT": "redline-compliance",
-    }
+    # Only the job-specific values travel as --env overrides; the child inherits
+    # the rest of the environment (HF_TOKEN etc.) without copying os.environ.
+    overrides = [
+        f"HF_DATASET_REPO={HF_DATASET_REPO}",
+        f"HF_MODEL_REPO={HF_MODEL_REPO}",
+        "WANDB_PROJECT=redline-compliance",
+    ]
 
     log.info("Submitting HF Jobs pipeline: validate -> retrain -> eval")
     result = subprocess.run(
-        [sys.executable, "jobs/run_job.py", "pipeline", "validate", "retrain", "eval"],
-        env=env,
+        [sys.executable, "jobs/run_job.py", "pipeline", "validate", "retrain", "eval",
+         "--env", *overrides],
         capture_output=True,
         text=True,
     )
@@ -163,7 +164,8 @@ def _log_retrain_event(merged_count: int):
     try:
         import wandb
 
-        wandb.init(
+        # The context manager finishes the run even if logging raises
+        with wandb.init(
             project="redline-compliance",
             name=f"auto-retrain-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}",
             config={
@@ -171,12 +173,11 @@ def _log_retrain_event(merged_count: int):
                 "merged_corrections": merged_count,
                 "threshold": RETRAIN_THRESHOLD,
             },
-        )
-        wandb.log({
-            "auto_retrain/merged_corrections": merged_count,
-            "auto_retrain/threshold": RETRAIN_THRESHOLD,
-        })
-        wandb.finish()
+        ) as run:
+            run.log({
+                "auto_retrain/merged_corrections": merged_count,
+                "auto_retrain/threshold": RETRAIN_THRESHOLD,
+            })
     except Exception as e:
         log.warning("W&B auto-retrain logging failed: %s", e)
 
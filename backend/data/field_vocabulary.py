@@ -1,6 +1,8 @@
 """Canonical condition field vocabulary — injected into generation prompts and
 the inference system message to keep the model's output within a bounded set."""
 
+import functools
+
 CANONICAL_FIELDS: dict[str, str] = {
     "employee.location_state": "State where the employee works (e.g. 'CA')",
     "employee.classification": "exempt or non_exempt",
@@ -34,8 +36,12 @@ CANONICAL_FIELDS: dict[str, str] = {
 }
 
 
+@functools.lru_cache(maxsize=1)
 def format_field_list() -> str:
-    """Group fields by namespace and render as a bulleted list."""
+    """Group fields by namespace and render as a bulleted list.
+
+    CANONICAL_FIELDS is fixed at import, so the rendering is cached.
+    """
     lines = []
     current_ns = None
     for field, desc in CANONICAL_FIELDS.items():
@@ -16,6 +16,7 @@ Usage:
 """
 
 import argparse
+import functools
 import json
 import os
 import random
@@ -28,7 +29,7 @@ from threading import Lock
 
 from google import genai
 import jsonschema
-from tenacity import retry, stop_after_attempt, wait_exponential
+import orjson
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from data.field_vocabulary import CANONICAL_FIELDS, format_field_list
@@ -248,27 +249,66 @@ Generate the output now."""
 
 
 def build_prompt(spec: dict) -> str:
-    operator_hint = spec.get("operator_hint")
+    topic, style, juris, complexity = spec["topic"], spec["style"], spec["jurisdiction"], spec["complexity"]
+    return _render_prompt(
+        topic["name"],
+        topic["ca_law"],
+        topic["federal_law"],
+        topic["conflict"],
+        spec["rule_type"],
+        style["instruction"],
+        juris["instruction"],
+        complexity["instruction"],
+        complexity["rule_count"],
+        spec["contrastive"]["instruction"],
+        spec.get("operator_hint"),
+        spec.get("confidence_hint", "high"),
+        spec.get("logic_hint", "all"),
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def _render_prompt(
+    topic_name: str,
+    ca_law: str,
+    federal_law: str,
+    conflict: str,
+    rule_type: str,
+    style_instruction: str,
+    jurisdiction_instruction: str,
+    complexity_instruction: str,
+    rule_count: str,
+    contrastive_instruction: str,
+    operator_hint: str | None,
+    confidence_hint: str,
+    logic_hint: str,
+) -> str:
+    """GENERATION_PROMPT for one combination of spec values.
+
+    Keyed on the rendered strings rather than spec ids: targeted specs reuse
+    the contrastive ids with different instructions. The attribute space is
+    a few hundred combinations, so repeat specs across cycles are lookups.
+    """
     if operator_hint:
         operator_hint_instruction = f"\n- At least one condition MUST use the '{operator_hint}' operator."
     else:
         operator_hint_instruction = ""
 
     return GENERATION_PROMPT.format(
-        topic_name=spec["topic"]["name"],
-        ca_law=spec["topic"]["ca_law"],
-        federal_law=spec["topic"]["federal_law"],
-        conflict=spec["topic"]["conflict"],
-        rule_type=spec["rule_type"],
-        style_instruction=spec["style"]["instruction"],
-        jurisdiction_instruction=spec["jurisdiction"]["instruction"],
-        complexity_instruction=spec["complexity"]["instruction"],
-        rule_count=spec["complexity"]["rule_count"],
-        contrastive_instruction=spec["contrastive"]["instruction"],
+        topic_name=topic_name,
+        ca_law=ca_law,
+        federal_law=federal_law,
+        conflict=conflict,
+        rule_type=rule_type,
+        style_instruction=style_instruction,
+        jurisdiction_instruction=jurisdiction_instruction,
+        complexity_instruction=complexity_instruction,
+        rule_count=rule_count,
+        contrastive_instruction=contrastive_instruction,
         field_list=format_field_list(),
         operator_hint_instruction=operator_hint_instruction,
-        confidence_hint=spec.get("confidence_hint", "high"),
-        logic_hint=spec.get("logic_hint", "all"),
+        confidence_hint=confidence_hint,
+        logic_hint=logic_hint,
     )
 
 
@@ -293,8 +333,8 @@ def parse_response(text: str) -> tuple[str | None, dict | None, str | None]:
         json_str = json_str[:-3].rstrip()
 
     try:
-        json_dict = json.loads(json_str)
-    except json.JSONDecodeError as e:
+        json_dict = orjson.loads(json_str)
+    except orjson.JSONDecodeError as e:
         return policy_text, None, f"invalid JSON: {e}"
 
     return policy_text, json_dict, None
@@ -315,13 +355,22 @@ def validate_sample(policy_text: str, extraction: dict, schema: dict) -> list[st
     return errors
 
 
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(min=1, max=30),
-)
+GEN_MAX_ATTEMPTS = 3
+
+
+def retry_delay(attempt: int, min_wait: float = 1.0, max_wait: float = 30.0) -> float:
+    """Seconds to wait after failed attempt (0-based): clamped 2**attempt plus up to 1s jitter."""
+    return min(max_wait, max(min_wait, 2.0 ** attempt)) + random.random()
+
+
 def generate_single(client: genai.Client, model: str, prompt: str) -> str:
-    response = client.models.generate_content(model=model, contents=prompt)
-    return response.text
+    for attempt in range(GEN_MAX_ATTEMPTS):
+        try:
+            return client.models.generate_content(model=model, contents=prompt).text
+        except Exception:
+            if attempt == GEN_MAX_ATTEMPTS - 1:
+                raise
+            time.sleep(retry_delay(attempt))
 
 
 SYSTEM_MESSAGE = (
@@ -2,9 +2,12 @@ from eval.scorers import (
     ConfidenceCalibrationScorer,
     FailureModeScorer,
     FieldAccuracyScorer,
+    PreparedExpected,
     RuleDetectionScorer,
     SchemaValidityScorer,
+    ScoringContext,
     SourceTextOverlapScorer,
+    score_batch,
 )
 
 __all__ = [
@@ -14,4 +17,7 @@ __all__ = [
     "SourceTextOverlapScorer",
     "ConfidenceCalibrationScorer",
     "FailureModeScorer",
+    "PreparedExpected",
+    "ScoringContext",
+    "score_batch",
 ]
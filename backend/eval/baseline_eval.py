@@ -14,21 +14,18 @@ from pathlib import Path
 
 from mistralai import Mistral
 
+from eval.prompt import load_prompt_parts
 from eval.scorers import (
     ConfidenceCalibrationScorer,
     FailureModeScorer,
     FieldAccuracyScorer,
+    PreparedExpected,
     RuleDetectionScorer,
     SchemaValidityScorer,
+    ScoringContext,
     SourceTextOverlapScorer,
 )
 
-PROMPT_TEMPLATE_PATH = Path(__file__).parent.parent / "schema" / "prompt_template.txt"
-
-
-def load_prompt_template() -> str:
-    return PROMPT_TEMPLATE_PATH.read_text()
-
 
 def load_test_data(path: str) -> list[dict]:
     samples = []
@@ -54,9 +51,8 @@ def extract_policy_and_expected(sample: dict) -> tuple[str, dict]:
 
 def run_extraction(client: Mistral, model: str, policy_text: str) -> str:
     """Run zero-shot extraction via Mistral API."""
-    template = load_prompt_template()
-    system_msg = template.split("USER:")[0].replace("SYSTEM:", "").strip()
-    user_msg = template.split("USER:")[1].strip().replace("{policy_text}", policy_text)
+    system_msg, user_tpl = load_prompt_parts()
+    user_msg = user_tpl.replace("{policy_text}", policy_text)
 
     response = client.chat.complete(
         model=model,
@@ -115,8 +111,9 @@ def evaluate(test_path: str, model: str = "open-mistral-7b", limit: int | None =
         print(f"({latency:.1f}s)")
 
         result = {"sample_index": i, "latency_ms": latency * 1000}
+        ctx = ScoringContext(output, PreparedExpected.from_expected(expected), policy_text)
         for name, scorer in scorers.items():
-            result[name] = scorer.score(output, expected, policy_text)
+            result[name] = scorer.score_ctx(ctx)
 
         all_results.append(result)
 
@@ -151,8 +148,7 @@ def evaluate(test_path: str, model: str = "open-mistral-7b", limit: int | None =
     print(f"\nResults saved to {results_path}")
 
     if use_wandb:
-        wandb.log(agg)
-        # Log per-sample table
+        # Per-sample table goes out in the same log call as the aggregates
         table = wandb.Table(columns=["sample", "schema_valid", "field_accuracy", "precision", "recall", "f1", "source_overlap", "latency_ms"])
         for r in all_results:
             table.add_data(
@@ -165,7 +161,7 @@ def evaluate(test_path: str, model: str = "open-mistral-7b", limit: int | None =
                 r["source"].get("source_text_overlap", 0) or 0,
                 r["latency_ms"],
             )
-        wandb.log({"baseline_results": table})
+        wandb.log({**agg, "baseline_results": table})
         wandb.finish()
 
     return agg, all_results
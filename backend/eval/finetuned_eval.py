@@ -13,30 +13,27 @@ import asyncio
 import json
 import os
 import time
-from pathlib import Path
 
 import requests
 
+from eval.prompt import load_prompt_parts
 from eval.scorers import (
     ConfidenceCalibrationScorer,
     FailureModeScorer,
     FieldAccuracyScorer,
+    PreparedExpected,
     RuleDetectionScorer,
     SchemaValidityScorer,
+    ScoringContext,
     SourceTextOverlapScorer,
 )
 
-PROMPT_TEMPLATE_PATH = Path(__file__).parent.parent / "schema" / "prompt_template.txt"
 RULE_TYPES = ["entitlement", "restriction", "leave", "termination", "compensation", "eligibility"]
 
 _local_model = None
 _local_tokenizer = None
 
 
-def load_prompt_template() -> str:
-    return PROMPT_TEMPLATE_PATH.read_text()
-
-
 def load_test_data(path: str) -> list[dict]:
     samples = []
     with open(path) as f:
@@ -98,9 +95,8 @@ def run_extraction_local(policy_text: str) -> str:
 
 
 def run_extraction_endpoint(endpoint_url: str, policy_text: str) -> str:
-    template = load_prompt_template()
-    system_msg = template.split("USER:")[0].replace("SYSTEM:", "").strip()
-    user_msg = template.split("USER:")[1].strip().replace("{policy_text}", policy_text)
+    system_msg, user_tpl = load_prompt_parts()
+    user_msg = user_tpl.replace("{policy_text}", policy_text)
 
     models_resp = requests.get(f"{endpoint_url}/v1/models", timeout=10)
     model_name = models_resp.json()["data"][0]["id"]
@@ -126,9 +122,8 @@ def run_extraction_mistral(policy_text: str, model: str) -> str:
     from mistralai import Mistral
 
     client = Mistral(api_key=os.environ["MISTRAL_API_KEY"])
-    template = load_prompt_template()
-    system_msg = template.split("USER:")[0].replace("SYSTEM:", "").strip()
-    user_msg = template.split("USER:")[1].strip().replace("{policy_text}", policy_text)
+    system_msg, user_tpl = load_prompt_parts()
+    user_msg = user_tpl.replace("{policy_text}", policy_text)
 
     response = client.chat.complete(
         model=model,
@@ -174,8 +169,9 @@ def _manual_eval_loop(
         print(f"({latency:.1f}s)")
 
         result = {"latency_ms": latency * 1000}
+        ctx = ScoringContext(output, PreparedExpected.from_expected(expected), policy_text)
         for name, scorer in scorers.items():
-            result[name] = scorer.score(output, expected, policy_text)
+            result[name] = scorer.score_ctx(ctx)
         all_results.append(result)
 
     n = len(all_results)
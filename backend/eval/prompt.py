@@ -0,0 +1,19 @@
+"""Prompt template shared by the baseline and fine-tuned evaluations."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+
+PROMPT_TEMPLATE_PATH = Path(__file__).parent.parent / "schema" / "prompt_template.txt"
+
+
+def load_prompt_template() -> str:
+    return PROMPT_TEMPLATE_PATH.read_text()
+
+
+@lru_cache(maxsize=1)
+def load_prompt_parts() -> tuple[str, str]:
+    """(system message, user template) from the prompt template, read and split once."""
+    system_part, user_part = load_prompt_template().split("USER:")[:2]
+    return system_part.replace("SYSTEM:", "").strip(), user_part.strip()
@@ -2,40 +2,73 @@
 
 Each scorer has a `score(output, expected, input_text) -> dict` interface.
 Works standalone and integrates with W&B Weave when available.
+
+`expected` may be a raw dict or a `PreparedExpected`. Batch callers running several
+scorers over the same row should build one `ScoringContext` per row and call
+`score_ctx(ctx)` on each scorer, so parsing and rule alignment happen once.
 """
 
 from __future__ import annotations
 
+import atexit
 import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
+import ahocorasick
+import fastjsonschema
 import jsonschema
+import orjson
+
+__all__ = [
+    "SchemaValidityScorer",
+    "FieldAccuracyScorer",
+    "RuleDetectionScorer",
+    "SourceTextOverlapScorer",
+    "ConfidenceCalibrationScorer",
+    "FailureModeScorer",
+    "PreparedExpected",
+    "ScoringContext",
+    "score_batch",
+]
 
 SCHEMA_PATH = Path(__file__).parent.parent / "schema" / "decision_logic.json"
 
+# Use the (slower) jsonschema validator for exact best-match messages and paths.
+SCHEMA_DEBUG = os.environ.get("REDLINE_SCHEMA_DEBUG", "false").lower() == "true"
+
 
 def _load_schema() -> dict:
     with open(SCHEMA_PATH) as f:
         return json.load(f)
 
 
+_FAST_VALIDATOR = fastjsonschema.compile(_load_schema())
+
+_FENCE_START_RE = re.compile(r"\s*```")
+_FENCE_RE = re.compile(r"^```[^\n]*\n?|\n?```\s*$", re.M)
+
+
 def _parse_json(text: str) -> tuple[dict | None, str | None]:
     """Try to parse JSON from model output, handling markdown code fences.
 
     Returns (dict, None) on success or (None, error_string) on failure.
     If the parsed JSON is not a dict (e.g. a list), returns None with an error.
     """
-    text = text.strip()
-    if text.startswith("```"):
-        lines = text.split("\n")
-        lines = [l for l in lines if not l.strip().startswith("```")]
-        text = "\n".join(lines)
+    # Most outputs are unfenced: an anchored match detects a fence without copying
+    # the text, and orjson tolerates the surrounding whitespace strip() used to remove.
+    fence = _FENCE_START_RE.match(text)
+    if fence is not None:
+        text = _FENCE_RE.sub("", text[fence.end() - 3:])
     try:
-        parsed = json.loads(text)
+        parsed = orjson.loads(text)
         if not isinstance(parsed, dict):
             return None, f"expected JSON object, got {type(parsed).__name__}"
         return parsed, None
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         return None, str(e)
 
 
@@ -48,7 +81,7 @@ def _action_signature(rule: dict) -> str:
     return json.dumps(rule.get("action", {}), sort_keys=True)
 
 
-def _structure_signature(rule: dict) -> tuple:
+def _structure_signature(rule: dict) -> tuple[str | None, tuple[str, ...], str]:
     return (
         rule.get("condition_logic"),
         _conditions_signature(rule),
@@ -56,14 +89,77 @@ def _structure_signature(rule: dict) -> tuple:
     )
 
 
-def _align_rules(expected_rules: list[dict], output_rules: list[dict]) -> tuple[list[tuple[dict, dict]], list[dict], list[dict]]:
+@dataclass(frozen=True)
+class PreparedExpected:
+    """Expected extraction with per-rule signatures computed once.
+
+    All tuples are positional and parallel to `rules`.
+    """
+
+    rules: tuple[dict, ...]
+    cond_sigs: tuple[tuple[str, ...], ...]
+    action_sigs: tuple[str, ...]
+    field_sets: tuple[frozenset, ...]
+    struct_sigs: tuple[tuple, ...]
+    # Canonical bytes of the rules list, for the exact-match shortcut.
+    canonical: bytes | None
+    # True if any rule repeats a condition field (FailureModeScorer then reports
+    # failures even for an exact copy, so it must not shortcut).
+    repeated_fields: bool
+
+    @classmethod
+    def from_expected(cls, expected: dict) -> PreparedExpected:
+        rules = tuple(expected.get("rules", []))
+        cond_sigs = tuple(_conditions_signature(r) for r in rules)
+        action_sigs = tuple(_action_signature(r) for r in rules)
+        field_sets = tuple(frozenset(c.get("field") for c in r.get("conditions", [])) for r in rules)
+        return cls(
+            rules=rules,
+            cond_sigs=cond_sigs,
+            action_sigs=action_sigs,
+            field_sets=field_sets,
+            struct_sigs=tuple(
+                (r.get("condition_logic"), cs, acs) for r, cs, acs in zip(rules, cond_sigs, action_sigs)
+            ),
+            canonical=_canonical(list(rules)),
+            repeated_fields=any(
+                len(fs) != len(r.get("conditions", [])) for r, fs in zip(rules, field_sets)
+            ),
+        )
+
+
+def _canonical(value) -> bytes | None:
+    try:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+    except orjson.JSONEncodeError:
+        return None
+
+
+def _fast_equal(out_rules: list[dict], prepared: PreparedExpected) -> bool:
+    """True if the output rules are an exact copy of the expected rules.
+
+    Alignment of identical rule lists is the identity, so scorers can emit their
+    all-correct result without walking rules and conditions.
+    """
+    return prepared.canonical is not None and bool(prepared.rules) and _canonical(out_rules) == prepared.canonical
+
+
+def _align_rules(
+    expected_rules: list[dict] | tuple[dict, ...],
+    output_rules: list[dict],
+    expected_sigs: tuple[tuple, ...] | None = None,
+) -> tuple[list[tuple[dict, dict]], list[dict], list[dict], list[int], set[int]]:
     """Align expected/output rules with id-first then structural matching.
 
-    Returns: (matched_pairs, unmatched_expected, unmatched_output)
+    `expected_sigs`, when given, are precomputed structure signatures parallel to
+    `expected_rules` (see `PreparedExpected.struct_sigs`).
+
+    Returns: (matched_pairs, unmatched_expected, unmatched_output, exp_to_out, used_out)
+    where exp_to_out[i] is the output index aligned with expected rule i, or -1,
+    and used_out is the set of matched output indices.
     """
-    matched: list[tuple[dict, dict]] = []
+    exp_to_out = [-1] * len(expected_rules)
     used_out: set[int] = set()
-    remaining_exp: list[int] = []
 
     # Pass 1: exact rule_id match.
     out_id_to_idx: dict[str, list[int]] = {}
@@ -72,20 +168,14 @@ def _align_rules(expected_rules: list[dict], output_rules: list[dict]) -> tuple[
         if rid:
             out_id_to_idx.setdefault(rid, []).append(oi)
 
-    for exp_rule in expected_rules:
+    for ei, exp_rule in enumerate(expected_rules):
         rid = exp_rule.get("rule_id")
-        matched_idx = None
         if rid and rid in out_id_to_idx:
             for oi in out_id_to_idx[rid]:
                 if oi not in used_out:
-                    matched_idx = oi
+                    used_out.add(oi)
+                    exp_to_out[ei] = oi
                     break
-        if matched_idx is None:
-            remaining_exp.append(len(matched))
-            matched.append((exp_rule, None))
-        else:
-            used_out.add(matched_idx)
-            matched.append((exp_rule, output_rules[matched_idx]))
 
     # Pass 2: structural match for unmatched expected rules.
     out_struct_to_idx: dict[tuple, list[int]] = {}
@@ -94,142 +184,203 @@ def _align_rules(expected_rules: list[dict], output_rules: list[dict]) -> tuple[
             continue
         out_struct_to_idx.setdefault(_structure_signature(out_rule), []).append(oi)
 
-    for pos in remaining_exp:
-        exp_rule, out_rule = matched[pos]
-        if out_rule is not None:
+    for ei, exp_rule in enumerate(expected_rules):
+        if exp_to_out[ei] != -1:
             continue
-        sig = _structure_signature(exp_rule)
-        candidate_idx = None
+        sig = expected_sigs[ei] if expected_sigs is not None else _structure_signature(exp_rule)
         for oi in out_struct_to_idx.get(sig, []):
             if oi not in used_out:
-                candidate_idx = oi
+                used_out.add(oi)
+                exp_to_out[ei] = oi
                 break
-        if candidate_idx is not None:
-            used_out.add(candidate_idx)
-            matched[pos] = (exp_rule, output_rules[candidate_idx])
 
-    matched_pairs = [(exp, out) for exp, out in matched if out is not None]
-    unmatched_expected = [exp for exp, out in matched if out is None]
+    matched_pairs = [(expected_rules[ei], output_rules[oi]) for ei, oi in enumerate(exp_to_out) if oi != -1]
+    unmatched_expected = [expected_rules[ei] for ei, oi in enumerate(exp_to_out) if oi == -1]
     unmatched_output = [output_rules[i] for i in range(len(output_rules)) if i not in used_out]
-    return matched_pairs, unmatched_expected, unmatched_output
+    return matched_pairs, unmatched_expected, unmatched_output, exp_to_out, used_out
+
+
+@dataclass
+class ScoringContext:
+    """One evaluation row, shared by every scorer that runs on it.
 
+    Parsing, expected-rule preparation, the exact-match check and rule alignment
+    each run at most once per context, however many scorers consume it.
+    """
 
-class SchemaValidityScorer:
-    """Check if output is valid JSON matching the decision_logic schema."""
+    output: str
+    expected: dict | PreparedExpected | None = None
+    input_text: str = ""
+    parsed: dict | None = None
+    parse_error: str | None = None
+    alignment: tuple | None = None
+    _is_parsed: bool = field(default=False, init=False, repr=False)
+    _exact_match: bool | None = field(default=None, init=False, repr=False)
+
+    def ensure_parsed(self) -> dict | None:
+        if not self._is_parsed:
+            self.parsed, self.parse_error = _parse_json(self.output)
+            self._is_parsed = True
+        return self.parsed
+
+    def ensure_prepared(self) -> PreparedExpected:
+        """Requires `expected` to be set."""
+        if not isinstance(self.expected, PreparedExpected):
+            self.expected = PreparedExpected.from_expected(self.expected)
+        return self.expected
+
+    def exact_match(self) -> bool:
+        """Requires a parsed output and `expected`."""
+        if self._exact_match is None:
+            self._exact_match = _fast_equal(self.parsed.get("rules", []), self.ensure_prepared())
+        return self._exact_match
+
+    def ensure_alignment(self) -> tuple:
+        """Requires a parsed output and `expected`. Returns `_align_rules` output."""
+        if self.alignment is None:
+            prepared = self.ensure_prepared()
+            self.alignment = _align_rules(prepared.rules, self.parsed.get("rules", []), prepared.struct_sigs)
+        return self.alignment
+
+
+class _ContextScorer:
+    def score(self, output: str, expected: dict | PreparedExpected | None = None, input_text: str = "") -> dict:
+        return self.score_ctx(ScoringContext(output, expected, input_text))
+
+    def score_ctx(self, ctx: ScoringContext) -> dict:
+        raise NotImplementedError
+
+
+class SchemaValidityScorer(_ContextScorer):
+    """Check if output is valid JSON matching the decision_logic schema.
+
+    With `detailed=False` only the pass/fail flags are reported, skipping error
+    message and path construction; use it for throughput-bound runs such as CI.
+    """
 
-    def __init__(self):
+    def __init__(self, detailed: bool = True):
         self.schema = _load_schema()
+        self.detailed = detailed
+        self._fast = _FAST_VALIDATOR
+        self._validator = jsonschema.validators.validator_for(self.schema)(self.schema)
 
-    def score(self, output: str, expected: dict | None = None, input_text: str = "") -> dict:
-        parsed, parse_error = _parse_json(output)
+    def score_ctx(self, ctx: ScoringContext) -> dict:
+        parsed = ctx.ensure_parsed()
 
         if parsed is None:
             return {
                 "schema_valid": False,
                 "json_parseable": False,
-                "parse_error": parse_error,
+                "parse_error": ctx.parse_error,
+            }
+
+        if not self.detailed:
+            return {"schema_valid": self._is_valid(parsed), "json_parseable": True}
+
+        if SCHEMA_DEBUG:
+            error = jsonschema.exceptions.best_match(self._validator.iter_errors(parsed))
+            if error is None:
+                return {"schema_valid": True, "json_parseable": True}
+            return {
+                "schema_valid": False,
+                "json_parseable": True,
+                "validation_error": error.message,
+                "error_path": list(error.absolute_path),
             }
 
         try:
-            jsonschema.validate(instance=parsed, schema=self.schema)
+            self._fast(parsed)
             return {"schema_valid": True, "json_parseable": True}
-        except jsonschema.ValidationError as e:
+        except fastjsonschema.JsonSchemaValueException as e:
             return {
                 "schema_valid": False,
                 "json_parseable": True,
                 "validation_error": e.message,
-                "error_path": list(e.absolute_path),
+                # fastjsonschema paths are rooted at a synthetic "data" element.
+                "error_path": [int(p) if p.isdigit() else p for p in e.path[1:]],
             }
 
+    def _is_valid(self, parsed: dict) -> bool:
+        if SCHEMA_DEBUG:
+            return self._validator.is_valid(parsed)
+        try:
+            self._fast(parsed)
+            return True
+        except fastjsonschema.JsonSchemaValueException:
+            return False
 
-class FieldAccuracyScorer:
+
+class FieldAccuracyScorer(_ContextScorer):
     """Per-field exact match between output and expected extraction."""
 
-    def score(self, output: str, expected: dict | None = None, input_text: str = "") -> dict:
-        if expected is None:
+    def score_ctx(self, ctx: ScoringContext) -> dict:
+        if ctx.expected is None:
             return {"field_accuracy": None, "error": "no expected output provided"}
 
-        parsed, parse_error = _parse_json(output)
+        parsed = ctx.ensure_parsed()
         if parsed is None:
-            return {"field_accuracy": 0.0, "parse_error": parse_error}
+            return {"field_accuracy": 0.0, "parse_error": ctx.parse_error}
 
+        prepared = ctx.ensure_prepared()
         out_rules = parsed.get("rules", [])
-        exp_rules = expected.get("rules", [])
+        exp_rules = prepared.rules
 
         if not exp_rules:
             return {"field_accuracy": 1.0 if not out_rules else 0.0}
 
-        matched_pairs, unmatched_expected, _ = _align_rules(exp_rules, out_rules)
-        matched_exp_ids = {id(exp): out for exp, out in matched_pairs}
-
-        fields_to_check = ["rule_type", "condition_logic"]
-        total_checks = 0
-        correct_checks = 0
-
-        for exp_rule in exp_rules:
-            out_rule = matched_exp_ids.get(id(exp_rule))
-            if out_rule is None:
-                total_checks += len(fields_to_check) + 2  # +2 for conditions, action
-                continue
-
-            # Simple fields
-            for field_name in fields_to_check:
-                total_checks += 1
-                if exp_rule.get(field_name) == out_rule.get(field_name):
-                    correct_checks += 1
-
-            # Conditions match
-            total_checks += 1
-            exp_conds = sorted(json.dumps(c, sort_keys=True) for c in exp_rule.get("conditions", []))
-            out_conds = sorted(json.dumps(c, sort_keys=True) for c in out_rule.get("conditions", []))
-            if exp_conds == out_conds:
-                correct_checks += 1
-
-            # Action match
-            total_checks += 1
-            exp_action = json.dumps(exp_rule.get("action", {}), sort_keys=True)
-            out_action = json.dumps(out_rule.get("action", {}), sort_keys=True)
-            if exp_action == out_action:
-                correct_checks += 1
-
-        accuracy = correct_checks / total_checks if total_checks > 0 else 0.0
+        if ctx.exact_match():
+            n = len(exp_rules)
+            return {
+                "field_accuracy": 1.0,
+                "correct_fields": 4 * n,
+                "total_fields": 4 * n,
+                "rule_type_accuracy": 1.0,
+                "conditions_accuracy": 1.0,
+                "action_accuracy": 1.0,
+                "matched_rules": n,
+                "missing_rules": 0,
+                "per_type_accuracy": {r.get("rule_type", "unknown"): 1.0 for r in exp_rules},
+            }
 
-        total_rules = len(exp_rules)
-        matched_count = len(matched_pairs)
-        rule_type_correct = sum(1 for exp, out in matched_pairs if exp.get("rule_type") == out.get("rule_type"))
-        cond_correct = sum(
-            1
-            for exp, out in matched_pairs
-            if _conditions_signature(exp) == _conditions_signature(out)
-        )
-        action_correct = sum(
-            1
-            for exp, out in matched_pairs
-            if _action_signature(exp) == _action_signature(out)
-        )
+        matched_pairs, unmatched_expected, _, exp_to_out, _ = ctx.ensure_alignment()
 
+        # A single pass over the expected rules derives every metric below.
+        checks_per_rule = 4  # rule_type, condition_logic, conditions, action
+        correct_checks = 0
+        rule_type_correct = 0
+        cond_correct = 0
+        action_correct = 0
         # Per-type accuracy: for each rule_type, fraction of fields correct across its rules.
-        # Missing rules (unmatched expected) count as 0 for their type.
         per_type_scores: dict[str, list[float]] = {}
-        for exp_rule in exp_rules:
+
+        for i, exp_rule in enumerate(exp_rules):
             rt = exp_rule.get("rule_type", "unknown")
-            out_rule = matched_exp_ids.get(id(exp_rule))
-            if out_rule is None:
+            oi = exp_to_out[i]
+            if oi == -1:
+                # Missing rules (unmatched expected) count as 0 for their type.
                 per_type_scores.setdefault(rt, []).append(0.0)
                 continue
-            checks, correct = 0, 0
-            for fn in fields_to_check:
-                checks += 1
-                if exp_rule.get(fn) == out_rule.get(fn):
-                    correct += 1
-            checks += 1
-            if (sorted(json.dumps(c, sort_keys=True) for c in exp_rule.get("conditions", []))
-                    == sorted(json.dumps(c, sort_keys=True) for c in out_rule.get("conditions", []))):
+            out_rule = out_rules[oi]
+
+            correct = 0
+            if exp_rule.get("rule_type") == out_rule.get("rule_type"):
+                rule_type_correct += 1
+                correct += 1
+            if exp_rule.get("condition_logic") == out_rule.get("condition_logic"):
                 correct += 1
-            checks += 1
-            if (_action_signature(exp_rule) == _action_signature(out_rule)):
+            if prepared.cond_sigs[i] == _conditions_signature(out_rule):
+                cond_correct += 1
                 correct += 1
-            per_type_scores.setdefault(rt, []).append(correct / checks if checks else 0.0)
+            if prepared.action_sigs[i] == _action_signature(out_rule):
+                action_correct += 1
+                correct += 1
+            correct_checks += correct
+            per_type_scores.setdefault(rt, []).append(correct / checks_per_rule)
+
+        total_rules = len(exp_rules)
+        total_checks = total_rules * checks_per_rule
+        accuracy = correct_checks / total_checks
+        matched_count = len(matched_pairs)
 
         per_type_accuracy = {rt: sum(v) / len(v) for rt, v in per_type_scores.items()}
 
@@ -246,20 +397,34 @@ class FieldAccuracyScorer:
         }
 
 
-class RuleDetectionScorer:
+class RuleDetectionScorer(_ContextScorer):
     """Precision and recall on rule count detection."""
 
-    def score(self, output: str, expected: dict | None = None, input_text: str = "") -> dict:
-        if expected is None:
+    def score_ctx(self, ctx: ScoringContext) -> dict:
+        if ctx.expected is None:
             return {"rule_detection": None, "error": "no expected output provided"}
 
-        parsed, parse_error = _parse_json(output)
+        parsed = ctx.ensure_parsed()
         if parsed is None:
-            return {"precision": 0.0, "recall": 0.0, "f1": 0.0, "parse_error": parse_error}
+            return {"precision": 0.0, "recall": 0.0, "f1": 0.0, "parse_error": ctx.parse_error}
 
         out_rules = parsed.get("rules", [])
-        exp_rules = expected.get("rules", [])
-        matched_pairs, unmatched_expected, unmatched_output = _align_rules(exp_rules, out_rules)
+        exp_rules = ctx.ensure_prepared().rules
+
+        if ctx.exact_match():
+            n = len(exp_rules)
+            return {
+                "precision": 1.0,
+                "recall": 1.0,
+                "f1": 1.0,
+                "expected_count": n,
+                "output_count": n,
+                "true_positives": n,
+                "hallucinated_rules": 0,
+                "missed_rules": 0,
+            }
+
+        matched_pairs, unmatched_expected, unmatched_output, _, _ = ctx.ensure_alignment()
 
         true_positives = len(matched_pairs)
         precision = true_positives / len(out_rules) if out_rules else 0.0
@@ -278,14 +443,18 @@ class RuleDetectionScorer:
         }
 
 
-class SourceTextOverlapScorer:
+class SourceTextOverlapScorer(_ContextScorer):
     """Check that source_text fields appear verbatim in the input policy text."""
 
-    def score(self, output: str, expected: dict | None = None, input_text: str = "") -> dict:
-        parsed, parse_error = _parse_json(output)
+    # With fewer rules, per-rule `in` scans beat building an automaton.
+    AUTOMATON_MIN_RULES = 8
+
+    def score_ctx(self, ctx: ScoringContext) -> dict:
+        parsed = ctx.ensure_parsed()
         if parsed is None:
-            return {"source_text_overlap": 0.0, "parse_error": parse_error}
+            return {"source_text_overlap": 0.0, "parse_error": ctx.parse_error}
 
+        input_text = ctx.input_text
         if not input_text:
             return {"source_text_overlap": None, "error": "no input_text provided"}
 
@@ -293,11 +462,14 @@ class SourceTextOverlapScorer:
         if not rules:
             return {"source_text_overlap": 1.0, "total_rules": 0}
 
-        matches = 0
-        for rule in rules:
-            source = rule.get("source_text", "")
-            if source and source in input_text:
-                matches += 1
+        if len(rules) < self.AUTOMATON_MIN_RULES:
+            matches = 0
+            for rule in rules:
+                source = rule.get("source_text", "")
+                if source and source in input_text:
+                    matches += 1
+        else:
+            matches = self._count_matches(rules, input_text)
 
         return {
             "source_text_overlap": matches / len(rules),
@@ -305,22 +477,43 @@ class SourceTextOverlapScorer:
             "total_rules": len(rules),
         }
 
+    @staticmethod
+    def _count_matches(rules: list[dict], input_text: str) -> int:
+        """Count rules whose source_text occurs in input_text with one Aho-Corasick sweep."""
+        needle_counts: dict[str, int] = {}
+        for rule in rules:
+            source = rule.get("source_text", "")
+            if source:
+                needle_counts[source] = needle_counts.get(source, 0) + 1
+        if not needle_counts:
+            return 0
+
+        automaton = ahocorasick.Automaton()
+        for needle in needle_counts:
+            automaton.add_word(needle, needle)
+        automaton.make_automaton()
+
+        found: set[str] = set()
+        for _, needle in automaton.iter(input_text):
+            found.add(needle)
+            if len(found) == len(needle_counts):
+                break
+        return sum(needle_counts[n] for n in found)
+
 
-class ConfidenceCalibrationScorer:
+class ConfidenceCalibrationScorer(_ContextScorer):
     """Check if confidence tags correlate with actual correctness."""
 
-    def score(self, output: str, expected: dict | None = None, input_text: str = "") -> dict:
-        if expected is None:
+    def score_ctx(self, ctx: ScoringContext) -> dict:
+        if ctx.expected is None:
             return {"confidence_calibration": None, "error": "no expected output"}
 
-        parsed, parse_error = _parse_json(output)
+        parsed = ctx.ensure_parsed()
         if parsed is None:
-            return {"confidence_calibration": 0.0, "parse_error": parse_error}
+            return {"confidence_calibration": 0.0, "parse_error": ctx.parse_error}
 
         out_rules = parsed.get("rules", [])
-        exp_rules = expected.get("rules", [])
-        matched_pairs, _, _ = _align_rules(exp_rules, out_rules)
-        matched_out = {id(out) for _, out in matched_pairs}
+        used_out = ctx.ensure_alignment()[4]
 
         buckets: dict[str, dict[str, int]] = {
             "high": {"correct": 0, "total": 0},
@@ -328,13 +521,13 @@ class ConfidenceCalibrationScorer:
             "low": {"correct": 0, "total": 0},
         }
 
-        for rule in out_rules:
+        for oi, rule in enumerate(out_rules):
             confidence = rule.get("confidence", "medium")
             if confidence not in buckets:
                 confidence = "medium"
             buckets[confidence]["total"] += 1
 
-            if id(rule) in matched_out:
+            if oi in used_out:
                 buckets[confidence]["correct"] += 1
 
         calibration = {}
@@ -351,59 +544,147 @@ class ConfidenceCalibrationScorer:
         }
 
 
-class FailureModeScorer:
+class FailureModeScorer(_ContextScorer):
     """Categorize extraction errors by type."""
 
     FAILURE_TYPES = [
         "missing_field", "wrong_operator", "hallucinated_rule", "malformed_json",
         "wrong_value", "extra_field", "wrong_rule_type", "missing_rule",
     ]
+    _FAILURE_IDX = {ft: i for i, ft in enumerate(FAILURE_TYPES)}
 
-    def score(self, output: str, expected: dict | None = None, input_text: str = "") -> dict:
-        parsed, parse_error = _parse_json(output)
+    def score_ctx(self, ctx: ScoringContext) -> dict:
+        parsed = ctx.ensure_parsed()
 
-        failures: dict[str, int] = {ft: 0 for ft in self.FAILURE_TYPES}
+        counts = [0] * len(self.FAILURE_TYPES)
 
         if parsed is None:
-            failures["malformed_json"] = 1
-            return {"failure_modes": failures, "total_failures": 1, "parse_error": parse_error}
+            counts[self._FAILURE_IDX["malformed_json"]] = 1
+            return {"failure_modes": self._as_dict(counts), "total_failures": 1, "parse_error": ctx.parse_error}
 
-        if expected is None:
-            return {"failure_modes": failures, "total_failures": 0}
+        if ctx.expected is None:
+            return {"failure_modes": self._as_dict(counts), "total_failures": 0}
 
+        prepared = ctx.ensure_prepared()
         out_rules = parsed.get("rules", [])
-        exp_rules = expected.get("rules", [])
-        matched_pairs, unmatched_expected, unmatched_output = _align_rules(exp_rules, out_rules)
+        exp_rules = prepared.rules
+        if not prepared.repeated_fields and ctx.exact_match():
+            return {"failure_modes": self._as_dict(counts), "total_failures": 0}
 
-        failures["hallucinated_rule"] += len(unmatched_output)
-        failures["missing_rule"] += len(unmatched_expected)
+        _, unmatched_expected, unmatched_output, exp_to_out, _ = ctx.ensure_alignment()
 
-        for exp_rule, out_rule in matched_pairs:
+        idx = self._FAILURE_IDX
+        missing_field = idx["missing_field"]
+        wrong_operator = idx["wrong_operator"]
+        wrong_value = idx["wrong_value"]
+        extra_field = idx["extra_field"]
+        wrong_rule_type = idx["wrong_rule_type"]
+
+        counts[idx["hallucinated_rule"]] += len(unmatched_output)
+        counts[idx["missing_rule"]] += len(unmatched_expected)
+
+        for ei, oi in enumerate(exp_to_out):
+            if oi == -1:
+                continue
+            exp_rule = exp_rules[ei]
+            out_rule = out_rules[oi]
 
             if exp_rule.get("rule_type") != out_rule.get("rule_type"):
-                failures["wrong_rule_type"] += 1
+                counts[wrong_rule_type] += 1
+
+            # Index output conditions by field (first occurrence wins, as in a
+            # linear scan) and count extra conditions not in expected.
+            exp_fields = prepared.field_sets[ei]
+            out_by_field: dict[str | None, dict] = {}
+            for oc in out_rule.get("conditions", []):
+                field_name = oc.get("field")
+                if field_name not in exp_fields:
+                    counts[extra_field] += 1
+                out_by_field.setdefault(field_name, oc)
 
             # Check conditions
-            exp_conds = exp_rule.get("conditions", [])
-            out_conds = out_rule.get("conditions", [])
-            for ec in exp_conds:
-                matched = False
-                for oc in out_conds:
-                    if ec.get("field") == oc.get("field"):
-                        matched = True
-                        if ec.get("operator") != oc.get("operator"):
-                            failures["wrong_operator"] += 1
-                        if ec.get("value") != oc.get("value"):
-                            failures["wrong_value"] += 1
-                        break
-                if not matched:
-                    failures["missing_field"] += 1
-
-            # Extra conditions not in expected
-            exp_fields = {c.get("field") for c in exp_conds}
-            for oc in out_conds:
-                if oc.get("field") not in exp_fields:
-                    failures["extra_field"] += 1
-
-        total = sum(failures.values())
-        return {"failure_modes": failures, "total_failures": total}
+            for ec in exp_rule.get("conditions", []):
+                oc = out_by_field.get(ec.get("field"))
+                if oc is None:
+                    counts[missing_field] += 1
+                    continue
+                if ec.get("operator") != oc.get("operator"):
+                    counts[wrong_operator] += 1
+                if ec.get("value") != oc.get("value"):
+                    counts[wrong_value] += 1
+
+        return {"failure_modes": self._as_dict(counts), "total_failures": sum(counts)}
+
+    def _as_dict(self, counts: list[int]) -> dict[str, int]:
+        return dict(zip(self.FAILURE_TYPES, counts))
+
+
+# ---------------------------------------------------------------------------
+# Batch scoring
+# ---------------------------------------------------------------------------
+
+# Below this many rows, pool dispatch and pickling cost more than they save.
+_MIN_PARALLEL_ROWS = 32
+
+_POOLS: dict[tuple, ProcessPoolExecutor] = {}
+_worker_scorer = None
+
+
+def _init_worker(scorer_cls: type, scorer_kwargs: dict) -> None:
+    global _worker_scorer
+    _worker_scorer = scorer_cls(**scorer_kwargs)
+
+
+def _score_one(row: tuple) -> dict:
+    return _worker_scorer.score(*row)
+
+
+@atexit.register
+def _shutdown_pools() -> None:
+    """Stop the cached worker pools at interpreter exit."""
+    while _POOLS:
+        _, pool = _POOLS.popitem()
+        pool.shutdown(cancel_futures=True)
+
+
+def _get_pool(scorer_cls: type, scorer_kwargs: dict, workers: int) -> ProcessPoolExecutor:
+    key = (scorer_cls, tuple(sorted(scorer_kwargs.items())), workers)
+    pool = _POOLS.get(key)
+    if pool is None:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(scorer_cls, scorer_kwargs),
+        )
+        _POOLS[key] = pool
+    return pool
+
+
+def score_batch(
+    scorer_cls: type,
+    rows: list[tuple[str, dict | PreparedExpected | None, str]],
+    workers: int | None = None,
+    threads: bool = False,
+    scorer_kwargs: dict | None = None,
+) -> list[dict]:
+    """Score `(output, expected, input_text)` rows in parallel, preserving order.
+
+    Each worker process constructs its own scorer once and is kept alive across
+    calls, so compiled validators are reused between batches. Pass `threads=True`
+    when rows are cheap enough that pickling them would dominate.
+    """
+    scorer_kwargs = scorer_kwargs or {}
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(rows) < _MIN_PARALLEL_ROWS:
+        scorer = scorer_cls(**scorer_kwargs)
+        return [scorer.score(*row) for row in rows]
+
+    if threads:
+        scorer = scorer_cls(**scorer_kwargs)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda row: scorer.score(*row), rows))
+
+    pool = _get_pool(scorer_cls, scorer_kwargs, workers)
+    chunksize = max(1, len(rows) // (workers * 4))
+    return list(pool.map(_score_one, rows, chunksize=chunksize))
@@ -3,9 +3,13 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import functools
 import os
+import re
 import sys
-import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 
 import yaml
 from huggingface_hub import HfApi
@@ -20,28 +24,55 @@ FLAVOR_MAP = {
     "cpu-upgrade": "cpu-upgrade",
 }
 
+# Status polling backs off from 1s to 60s, restarting whenever the job changes stage
+POLL_INTERVAL_MIN = 1.0
+POLL_INTERVAL_MAX = 60.0
+POLL_BACKOFF = 1.7
 
-def _load_config(config_path: str) -> dict:
-    with open(config_path) as f:
-        return yaml.safe_load(f)
+# Env keys forwarded to HF Jobs as secrets rather than plain env vars
+SECRET_KEYS = frozenset({"HF_TOKEN", "WANDB_API_KEY", "MISTRAL_API_KEY", "GEMINI_API_KEY"})
 
+# Upper bound on submissions in flight per trigger_jobs_bulk batch
+BULK_MAX_BATCH = 100
+BULK_MAX_WORKERS = 8
 
-def _resolve_env(config: dict, overrides: dict[str, str] | None = None) -> dict[str, str]:
-    """Resolve ${VAR:-default} references from os.environ."""
-    env = {}
-    for key, val in config.get("env", {}).items():
-        if isinstance(val, str) and val.startswith("${") and val.endswith("}"):
-            expr = val[2:-1]
-            if ":-" in expr:
-                var_name, default = expr.split(":-", 1)
-            else:
-                var_name, default = expr, ""
-            env[key] = os.environ.get(var_name, default)
-        else:
-            env[key] = str(val)
-    if overrides:
-        env.update(overrides)
-    return env
+# Streamed job log lines are written to stdout in batches of this size
+LOG_WRITE_BATCH = 64
+
+JOB_CONFIGS = {
+    "validate": "jobs/validate_data.yaml",
+    "retrain": "jobs/retrain.yaml",
+    "eval": "jobs/eval.yaml",
+    "generate": "jobs/generate_data.yaml",
+}
+
+# A stage waits only for those of its dependencies that are part of the same pipeline run.
+# generate pushes to DATASET_REPO, so every stage that downloads from it (validate,
+# retrain, eval) waits for generate; only readers of the same snapshot run together.
+STAGE_DEPS = {
+    "generate": (),
+    "validate": ("generate",),
+    "retrain": ("validate", "generate"),
+    "eval": ("retrain", "generate"),
+}
+
+
+_API: HfApi | None = None
+
+
+def get_api() -> HfApi:
+    """Process-wide HfApi client, created on first use."""
+    global _API
+    if _API is None:
+        _API = HfApi(token=os.environ.get("HF_TOKEN"))
+    return _API
+
+
+# ${VAR} or ${VAR:-default}; the lazy name stops at the first ":-"
+_ENV_REF_RE = re.compile(r"\$\{(.*?)(?::-(.*))?\}", re.S)
+
+# libyaml's C loader when the wheel was built with it, pure-Python otherwise
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 def _build_command(config: dict) -> str:
@@ -65,96 +96,222 @@ def _get_flavor(config: dict) -> str:
     return FLAVOR_MAP.get(gpu_type, "t4-medium")
 
 
-def trigger_job(config_path: str, env_overrides: dict[str, str] | None = None) -> str:
-    """Submit an HF Job from a YAML config. Returns the job ID."""
+def _parse_env_item(key: str, val) -> tuple[str, str | None, str]:
+    """(key, referenced var or None, default or literal value)."""
+    m = _ENV_REF_RE.fullmatch(val) if isinstance(val, str) else None
+    if m:
+        return key, m.group(1), m.group(2) or ""
+    return key, None, str(val)
+
+
+@dataclass(frozen=True)
+class JobConfig:
+    """A job YAML reduced to what submission needs, built once per file version."""
+
+    name: str
+    description: str
+    image: str
+    command: str
+    flavor: str
+    env_items: tuple[tuple[str, str | None, str], ...]
+
+    @classmethod
+    def from_dict(cls, config: dict) -> JobConfig:
+        return cls(
+            name=config["name"],
+            description=config.get("description", ""),
+            image=config.get("image", "python:3.12-slim"),
+            command=_build_command(config),
+            flavor=_get_flavor(config),
+            env_items=tuple(_parse_env_item(k, v) for k, v in config.get("env", {}).items()),
+        )
+
+
+@functools.lru_cache(maxsize=64)
+def _load_config_cached(config_path: str, mtime: float) -> JobConfig:
+    with open(config_path) as f:
+        return JobConfig.from_dict(yaml.load(f, Loader=_YAML_LOADER))
+
+
+def _load_config(config_path: str) -> JobConfig:
+    """Load a job YAML, re-reading it only when its mtime changes."""
+    return _load_config_cached(config_path, os.path.getmtime(config_path))
+
+
+def _resolve_env(config: JobConfig, overrides: dict[str, str] | None = None) -> dict[str, str]:
+    """Resolve ${VAR:-default} references from os.environ."""
+    environ = os.environ
+    env = {
+        key: environ.get(var_name, value) if var_name is not None else value
+        for key, var_name, value in config.env_items
+    }
+    if overrides:
+        env.update(overrides)
+    return env
+
+
+def _prepare_job(config_path: str, env_overrides: dict[str, str] | None = None) -> dict:
+    """Resolve a YAML config into HfApi.run_job keyword arguments."""
     config = _load_config(config_path)
     env = _resolve_env(config, env_overrides)
-    flavor = _get_flavor(config)
-    command = _build_command(config)
-    image = config.get("image", "python:3.12-slim")
-
-    # Split env into non-secret vars and secrets
-    secret_keys = {"HF_TOKEN", "WANDB_API_KEY", "MISTRAL_API_KEY", "GEMINI_API_KEY"}
-    secrets = {k: v for k, v in env.items() if k in secret_keys and v}
-    plain_env = {k: v for k, v in env.items() if k not in secret_keys}
-
-    print(f"Submitting HF Job: {config['name']}")
-    print(f"  Description: {config.get('description', '')}")
-    print(f"  Image:       {image}")
-    print(f"  Flavor:      {flavor}")
+
+    # Split env into non-secret vars and secrets in one pass
+    secrets, plain_env = {}, {}
+    for k, v in env.items():
+        if k not in SECRET_KEYS:
+            plain_env[k] = v
+        elif v:
+            secrets[k] = v
+
+    print(f"Submitting HF Job: {config.name}")
+    print(f"  Description: {config.description}")
+    print(f"  Image:       {config.image}")
+    print(f"  Flavor:      {config.flavor}")
     print(f"  Env vars:    {list(plain_env.keys())}")
     print(f"  Secrets:     {list(secrets.keys())}")
 
-    api = HfApi()
-    job = api.run_job(
-        image=image,
-        command=["bash", "-euxo", "pipefail", "-c", command],
-        env=plain_env,
-        secrets=secrets,
-        flavor=flavor,
-    )
+    return {
+        "image": config.image,
+        "command": ["bash", "-euxo", "pipefail", "-c", config.command],
+        "env": plain_env,
+        "secrets": secrets,
+        "flavor": config.flavor,
+    }
+
 
+def trigger_job(config_path: str, env_overrides: dict[str, str] | None = None) -> str:
+    """Submit an HF Job from a YAML config. Returns the job ID."""
+    job = get_api().run_job(**_prepare_job(config_path, env_overrides))
     print(f"  Job ID:  {job.id}")
     print(f"  Job URL: {job.url}")
     return job.id
 
 
+def trigger_jobs_bulk(
+    config_paths: list[str], env_overrides: dict[str, str] | None = None
+) -> list[str]:
+    """Submit several independent HF Jobs at once. Returns job IDs in input order.
+
+    HfApi has no multi-job endpoint, so the run_job requests are overlapped on
+    a thread pool, BULK_MAX_BATCH at a time. Configs are resolved up front so
+    their summaries print in order.
+    """
+    requests = [_prepare_job(path, env_overrides) for path in config_paths]
+    api = get_api()
+    jobs = []
+    with ThreadPoolExecutor(max_workers=min(BULK_MAX_WORKERS, max(len(requests), 1))) as pool:
+        for start in range(0, len(requests), BULK_MAX_BATCH):
+            batch = requests[start:start + BULK_MAX_BATCH]
+            jobs.extend(pool.map(lambda kwargs: api.run_job(**kwargs), batch))
+    for path, job in zip(config_paths, jobs):
+        print(f"  {path}: Job ID {job.id} ({job.url})")
+    return [job.id for job in jobs]
+
+
 def _print_job_logs(api: HfApi, job_id: str):
-    """Fetch and print the last logs from a job."""
+    """Stream a job's logs to stdout line by line without buffering the whole log."""
     try:
-        logs = api.fetch_job_logs(job_id=job_id)
-        print(f"  --- Job logs for {job_id} ---")
-        for line in logs:
-            print(f"  | {line}")
-        print(f"  --- End logs ---")
+        print(f"  --- Job logs for {job_id} ---", flush=True)
+        batch = []
+        for line in api.fetch_job_logs(job_id=job_id):
+            batch.append(f"  | {line}\n")
+            if len(batch) == LOG_WRITE_BATCH:
+                sys.stdout.write("".join(batch))
+                sys.stdout.flush()
+                batch.clear()
+        sys.stdout.write("".join(batch))
+        print(f"  --- End logs ---", flush=True)
+    except BrokenPipeError:
+        # stdout went away (e.g. piped into head); the job status still matters to the caller
+        pass
     except Exception as e:
         print(f"  (could not fetch logs: {e})")
 
 
-def wait_for_job(job_id: str, poll_interval: int = 30) -> str:
-    """Poll until job completes. Returns final status stage."""
-    api = HfApi()
+async def wait_for_job_async(job_id: str, max_interval: float = POLL_INTERVAL_MAX) -> str:
+    """Poll until job completes without blocking the event loop. Returns final status stage.
+
+    The poll interval grows geometrically up to max_interval and drops back to
+    POLL_INTERVAL_MIN on every stage transition, so short jobs return within a
+    second or two while long-running ones cost few API calls.
+    """
+    api = get_api()
     print(f"Polling job {job_id}...")
+    interval = POLL_INTERVAL_MIN
+    last_stage = None
     while True:
-        info = api.inspect_job(job_id=job_id)
+        info = await asyncio.to_thread(api.inspect_job, job_id=job_id)
         stage = info.status.stage
-        print(f"  Status: {stage}")
+        if stage != last_stage:
+            print(f"  Status ({job_id}): {stage}")
+            last_stage = stage
+            interval = POLL_INTERVAL_MIN
         if stage in ("COMPLETED", "ERROR", "CANCELED"):
             if stage == "ERROR":
-                _print_job_logs(api, job_id)
+                await asyncio.to_thread(_print_job_logs, api, job_id)
             return stage
-        time.sleep(poll_interval)
+        await asyncio.sleep(interval)
+        interval = min(interval * POLL_BACKOFF, max_interval)
+
+
+def wait_for_job(job_id: str, max_interval: float = POLL_INTERVAL_MAX) -> str:
+    """Blocking wrapper around wait_for_job_async for the CLI paths."""
+    return asyncio.run(wait_for_job_async(job_id, max_interval))
 
 
 def check_job_status(job_id: str):
-    api = HfApi()
+    api = get_api()
     info = api.inspect_job(job_id=job_id)
     print(f"Job {job_id}: {info.status.stage}")
 
 
-def run_pipeline(stages: list[str], env_overrides: dict[str, str] | None = None):
-    """Run pipeline stages sequentially: each must complete before the next starts."""
-    job_configs = {
-        "validate": "jobs/validate_data.yaml",
-        "retrain": "jobs/retrain.yaml",
-        "eval": "jobs/eval.yaml",
-        "generate": "jobs/generate_data.yaml",
-    }
+async def _run_pipeline_async(stages: list[str], env_overrides: dict[str, str] | None = None) -> bool:
+    requested = set(stages)
+    done: set[str] = set()
+    pending = list(stages)
+    while pending:
+        wave = [
+            s for s in pending
+            if all(d in done or d not in requested for d in STAGE_DEPS[s])
+        ]
+        pending = [s for s in pending if s not in wave]
+
+        print(f"\n{'='*50}\nStage: {', '.join(wave)}\n{'='*50}")
+        if len(wave) == 1:
+            job_ids = [await asyncio.to_thread(trigger_job, JOB_CONFIGS[wave[0]], env_overrides)]
+        else:
+            job_ids = await asyncio.to_thread(
+                trigger_jobs_bulk, [JOB_CONFIGS[s] for s in wave], env_overrides
+            )
 
-    for stage in stages:
-        if stage not in job_configs:
-            print(f"Unknown stage: {stage}. Available: {list(job_configs.keys())}")
-            sys.exit(1)
+        statuses = await asyncio.gather(*(wait_for_job_async(job_id) for job_id in job_ids))
+        failed = False
+        for stage, status in zip(wave, statuses):
+            if status != "COMPLETED":
+                print(f"Stage '{stage}' failed with status: {status}. Aborting pipeline.")
+                failed = True
+            else:
+                print(f"Stage '{stage}' completed successfully.")
+                done.add(stage)
+        if failed:
+            return False
+    return True
 
-        print(f"\n{'='*50}\nStage: {stage}\n{'='*50}")
-        job_id = trigger_job(job_configs[stage], env_overrides)
-        status = wait_for_job(job_id)
 
-        if status != "COMPLETED":
-            print(f"Stage '{stage}' failed with status: {status}. Aborting pipeline.")
+def run_pipeline(stages: list[str], env_overrides: dict[str, str] | None = None):
+    """Run pipeline stages in dependency order; a failed stage aborts the pipeline.
+
+    Stages whose dependencies (see STAGE_DEPS) have completed are submitted
+    together, e.g. validate and eval, and polled concurrently with
+    asyncio.gather before the next wave is submitted.
+    """
+    for stage in stages:
+        if stage not in JOB_CONFIGS:
+            print(f"Unknown stage: {stage}. Available: {list(JOB_CONFIGS.keys())}")
             sys.exit(1)
 
-        print(f"Stage '{stage}' completed successfully.")
+    if not asyncio.run(_run_pipeline_async(stages, env_overrides)):
+        sys.exit(1)
 
 
 def main():
@@ -169,7 +326,7 @@ def main():
     status_parser = subparsers.add_parser("status", help="Check job status")
     status_parser.add_argument("job_id", help="HF Job ID")
 
-    pipeline_parser = subparsers.add_parser("pipeline", help="Run pipeline stages sequentially")
+    pipeline_parser = subparsers.add_parser("pipeline", help="Run pipeline stages in dependency order")
     pipeline_parser.add_argument(
         "stages",
         nargs="+",
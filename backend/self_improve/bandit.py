@@ -0,0 +1,128 @@
+"""UCB1 bandit over (rule_type, failure_mode) targets.
+
+Some pairs respond to targeted data far better than others, and that
+only shows up after cycles are run. Each pair is an arm; the reward for a
+cycle is the targeted category's accuracy gain, clipped at zero. Observed
+arm statistics persist in BANDIT_STATE_PATH so they carry across loop
+runs; the EI prior is recomputed each run and never saved.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+from self_improve.config import (
+    BANDIT_EXPLORATION,
+    BANDIT_STATE_PATH,
+    DEFAULT_RESPONSIVENESS,
+    FAILURE_MODES,
+    RULE_TYPES,
+)
+from self_improve.inspect_metrics import MetricsSnapshot
+from self_improve.targeting import expected_improvement
+
+
+@dataclass
+class Arm:
+    pulls: int = 0
+    total_reward: float = 0.0
+    # Pseudo-observations from seed_prior; kept apart so they are never saved
+    prior_pulls: int = 0
+    prior_reward: float = 0.0
+
+    @property
+    def effective_pulls(self) -> int:
+        return self.pulls + self.prior_pulls
+
+    @property
+    def mean(self) -> float:
+        n = self.effective_pulls
+        return (self.total_reward + self.prior_reward) / n if n else 0.0
+
+    def ucb(self, total_pulls: int, c: float = BANDIT_EXPLORATION) -> float:
+        """mean + c * sqrt(2 ln N / n); an arm with no pulls or prior is tried first."""
+        n = self.effective_pulls
+        if n == 0:
+            return math.inf
+        return self.mean + c * math.sqrt(2.0 * math.log(total_pulls) / n)
+
+
+class TargetBandit:
+    """Arms keyed by (rule_type, failure_mode)."""
+
+    def __init__(self, arms: dict[tuple[str, str], Arm] | None = None):
+        self.arms = arms or {}
+        for rt in RULE_TYPES:
+            for fm in FAILURE_MODES:
+                self.arms.setdefault((rt, fm), Arm())
+
+    @classmethod
+    def load(cls, path: str = BANDIT_STATE_PATH) -> TargetBandit:
+        """Load arm statistics from disk, or start fresh if none are saved."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        arms = {
+            (a["rule_type"], a["failure_mode"]): Arm(a["pulls"], a["total_reward"])
+            for a in data.get("arms", [])
+        }
+        return cls(arms)
+
+    def save(self, path: str = BANDIT_STATE_PATH):
+        """Write the observed arm statistics to path atomically; the prior is left out."""
+        data = {
+            "arms": [
+                {"rule_type": rt, "failure_mode": fm, "pulls": a.pulls, "total_reward": a.total_reward}
+                for (rt, fm), a in self.arms.items()
+            ]
+        }
+        final = Path(path)
+        final.parent.mkdir(parents=True, exist_ok=True)
+        tmp = final.with_name(final.name + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, final)
+
+    @property
+    def total_pulls(self) -> int:
+        """Observed pulls plus prior pseudo-pulls, the N in the UCB bonus."""
+        return sum(a.effective_pulls for a in self.arms.values())
+
+    def seed_prior(self, snapshot: MetricsSnapshot, responsiveness: dict[str, float] | None = None):
+        """Give every never-pulled arm one pseudo-pull worth its EI prior.
+
+        Prior = EI(category accuracy) * responsiveness * failure-mode share,
+        so the first picks follow the EI targeting until real rewards arrive.
+        The pseudo-pull lives in the arm's prior fields, not its observed
+        counts, so save() never records it as evidence.
+        """
+        responsiveness = responsiveness or {}
+        total_failures = sum(snapshot.failure_modes.get(fm, 0) for fm in FAILURE_MODES)
+        for (rt, fm), arm in self.arms.items():
+            if arm.pulls:
+                continue
+            if total_failures:
+                share = snapshot.failure_modes.get(fm, 0) / total_failures
+            else:
+                share = 1.0 / len(FAILURE_MODES)
+            ei = expected_improvement(snapshot.per_type.get(rt, 0.0))
+            arm.prior_pulls = 1
+            arm.prior_reward = ei * responsiveness.get(rt, DEFAULT_RESPONSIVENESS) * share
+
+    def select(self, c: float = BANDIT_EXPLORATION) -> tuple[tuple[str, str], float]:
+        """Return the (rule_type, failure_mode) pair with the highest UCB and its score."""
+        n = max(1, self.total_pulls)
+        best_pair, best_arm = max(self.arms.items(), key=lambda kv: kv[1].ucb(n, c))
+        return best_pair, best_arm.ucb(n, c)
+
+    def update(self, pair: tuple[str, str], accuracy_before: float, accuracy_after: float):
+        """Record one cycle on pair; the reward is the accuracy gain, floored at 0."""
+        arm = self.arms.setdefault(pair, Arm())
+        arm.pulls += 1
+        arm.total_reward += max(0.0, accuracy_after - accuracy_before)
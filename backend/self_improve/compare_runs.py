@@ -6,8 +6,11 @@ regressions with configurable tolerance.
 
 from __future__ import annotations
 
+import argparse
+import functools
 from dataclasses import dataclass, field
-from math import comb, sqrt
+from itertools import accumulate
+from math import exp, lgamma, log, sqrt
 
 from self_improve.config import (
     CONVERGENCE_DELTA_THRESHOLD,
@@ -16,7 +19,7 @@ from self_improve.config import (
     RULE_TYPES,
     TARGETED_IMPROVEMENT_FLOOR,
 )
-from self_improve.inspect_metrics import MetricsSnapshot
+from self_improve.inspect_metrics import MetricsSnapshot, fetch_run_by_id
 
 
 @dataclass
@@ -74,6 +77,11 @@ class RunComparison:
         return "\n".join(lines)
 
 
+_Z95 = 1.96
+_DEFAULT_N = 50
+_Z95_OVER_SQRT_DEFAULT_N = _Z95 / sqrt(_DEFAULT_N)
+
+
 def _binomial_test_p_value(n: int, k: int, p0: float = 0.5) -> float:
     """One-sided exact binomial test.
 
@@ -83,12 +91,29 @@ def _binomial_test_p_value(n: int, k: int, p0: float = 0.5) -> float:
     For our use case: n = number of test samples where outcome changed,
     k = number that improved, p0 = 0.5 (null: equally likely to improve or regress).
     """
-    if n == 0:
+    if n == 0 or k <= 0:
         return 1.0
-    p_value = 0.0
-    for i in range(k, n + 1):
-        p_value += comb(n, i) * (p0 ** i) * ((1 - p0) ** (n - i))
-    return p_value
+    if k > n:
+        return 0.0
+    if p0 <= 0.0 or p0 >= 1.0:
+        return 1.0 if p0 >= 1.0 else 0.0
+    return min(1.0, _binomial_sf_table(n, p0)[k])
+
+
+@functools.lru_cache(maxsize=16)
+def _binomial_sf_table(n: int, p0: float) -> tuple[float, ...]:
+    """P(X >= i) for X ~ Binomial(n, p0), i = 0..n.
+
+    The pmf uses lgamma in log space, so no bigint comb() and no overflow
+    for large n. Calls sharing (n, p0), typically (50, 0.5), become a lookup.
+    """
+    log_p, log_q = log(p0), log(1 - p0)
+    log_n_fact = lgamma(n + 1)
+    pmf = [
+        exp(log_n_fact - lgamma(i + 1) - lgamma(n - i + 1) + i * log_p + (n - i) * log_q)
+        for i in range(n + 1)
+    ]
+    return tuple(accumulate(reversed(pmf)))[::-1]
 
 
 def _standard_error(p: float, n: int = 50) -> float:
@@ -102,9 +127,12 @@ def _is_significant(delta: float, p_before: float, n: int = 50, alpha: float = 0
     Uses the rule: |delta| > 1.96 * SE(p_before) for approximate 95% CI.
     With n=50, SE at p=0.5 is 0.0707, so the threshold is ~0.139.
     At p=0.8, SE is 0.0566, threshold is ~0.111.
+    The 1.96 / sqrt(n) factor is precomputed for the default n.
     """
-    se = _standard_error(p_before, n)
-    return abs(delta) > 1.96 * se
+    if not 0.0 < p_before < 1.0:
+        return abs(delta) > 0.0  # SE is zero at the boundaries
+    scale = _Z95_OVER_SQRT_DEFAULT_N if n == _DEFAULT_N else _Z95 / sqrt(n)
+    return abs(delta) > scale * sqrt(p_before * (1.0 - p_before))
 
 
 def compare_runs(
@@ -124,10 +152,14 @@ def compare_runs(
     comp.source_delta = after.source_text_overlap - before.source_text_overlap
     comp.latency_delta = after.avg_latency_ms - before.avg_latency_ms
 
-    # Per-category deltas with significance testing
+    # Per-category deltas with significance testing. RULE_TYPES is a handful of
+    # entries, so a plain loop over bound dict lookups beats building arrays.
+    before_get = before.per_type.get
+    after_get = after.per_type.get
+    per_type_deltas = comp.per_type_deltas
     for rt in RULE_TYPES:
-        val_before = before.per_type.get(rt, 0.0)
-        val_after = after.per_type.get(rt, 0.0)
+        val_before = before_get(rt, 0.0)
+        val_after = after_get(rt, 0.0)
         delta = val_after - val_before
         significant = _is_significant(delta, val_before, n_test_samples)
 
@@ -146,13 +178,14 @@ def compare_runs(
             significant=significant,
             direction=direction,
         )
-        comp.per_type_deltas[rt] = md
+        per_type_deltas[rt] = md
 
         # Track regressions on non-targeted categories
-        if rt != targeted_category and delta < -REGRESSION_TOLERANCE:
-            comp.regressions.append(md)
-        if rt != targeted_category and delta < -REGRESSION_ABORT_THRESHOLD:
-            comp.severe_regressions.append(md)
+        if rt != targeted_category and delta < 0:
+            if delta < -REGRESSION_TOLERANCE:
+                comp.regressions.append(md)
+            if delta < -REGRESSION_ABORT_THRESHOLD:
+                comp.severe_regressions.append(md)
 
     # Check if targeted category improved enough
     if targeted_category and targeted_category in comp.per_type_deltas:
@@ -175,6 +208,26 @@ def compare_runs(
     return comp
 
 
+def compare_runs_by_id(
+    before_id: str,
+    after_id: str,
+    targeted_category: str | None = None,
+    n_test_samples: int = 50,
+    project: str | None = None,
+    entity: str | None = None,
+) -> RunComparison:
+    """Compare two W&B runs by ID.
+
+    Snapshots come from fetch_run_by_id, which caches finished runs in
+    memory and on disk, so repeat comparisons skip the W&B calls. Runs
+    still in progress are re-read every time, so their metrics stay
+    current; the comparison itself is cheap to redo.
+    """
+    before = fetch_run_by_id(before_id, project, entity)
+    after = fetch_run_by_id(after_id, project, entity)
+    return compare_runs(before, after, targeted_category, n_test_samples)
+
+
 def print_comparison(comp: RunComparison, targeted_category: str | None = None):
     """Pretty-print a run comparison."""
     print(f"\n{'='*60}")
@@ -208,3 +261,26 @@ def print_comparison(comp: RunComparison, targeted_category: str | None = None):
     print(f"\n  Converged: {comp.converged}")
     print(f"  Targeted improved: {comp.targeted_category_improved}")
     print(f"  Verdict: {comp.verdict}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two Redline eval runs on W&B")
+    parser.add_argument("before_id", help="W&B run ID of the earlier run")
+    parser.add_argument("after_id", help="W&B run ID of the later run")
+    parser.add_argument("--target", choices=RULE_TYPES, help="Category the later run targeted")
+    parser.add_argument("--project", help="W&B project (default: WANDB_PROJECT)")
+    parser.add_argument("--entity", help="W&B entity (default: WANDB_ENTITY)")
+    args = parser.parse_args()
+
+    comp = compare_runs_by_id(
+        args.before_id,
+        args.after_id,
+        targeted_category=args.target,
+        project=args.project,
+        entity=args.entity,
+    )
+    print_comparison(comp, targeted_category=args.target)
+
+
+if __name__ == "__main__":
+    main()
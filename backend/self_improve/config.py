@@ -57,8 +57,9 @@ FAILURE_MODES = [
 # ---------------------------------------------------------------------------
 # Targeting strategy
 #
-# We use an Expected Improvement (EI) heuristic to select which category
-# to target next. EI(cat) = (target_accuracy - current_accuracy) * responsiveness.
+# We use Expected Improvement (EI) to select which category to target next.
+# EI(cat) = SE * (u*Phi(u) + phi(u)) * responsiveness, u = (target - current) / SE,
+# with SE the binomial standard error above (see self_improve/targeting.py).
 #
 # responsiveness is estimated from previous cycles: how much accuracy
 # improved per N samples added. If no prior data, use DEFAULT_RESPONSIVENESS.
@@ -67,6 +68,23 @@ TARGET_ACCURACY = 0.92  # aspirational ceiling per category
 DEFAULT_RESPONSIVENESS = 0.50  # prior: adding N samples yields ~50% of the gap
 CATEGORY_FLOOR = 0.70  # below this, a category is definitely a candidate
 
+# ---------------------------------------------------------------------------
+# Target bandit
+#
+# Opt-in (--bandit): instead of EI over categories, the loop targets a
+# (rule_type, failure_mode) pair chosen by UCB1 over all 6 x 8 = 48 pairs:
+# UCB = mean + c * sqrt(2 * ln(N) / n_arm), where the reward is the targeted
+# category's accuracy gain in that cycle.
+#
+# Per-cycle gains are a few hundredths, so c is scaled to match; at c=1 the
+# exploration bonus (~2.8 at N=48) would swamp every observed reward.
+# Each arm starts with one pseudo-pull worth its EI prior (scaled by the
+# failure mode's share of failures) so the first cycles exploit what the
+# baseline eval already shows instead of sweeping 48 untried arms.
+# ---------------------------------------------------------------------------
+BANDIT_EXPLORATION = 0.05
+BANDIT_STATE_PATH = "data/bandit_state.json"
+
 # ---------------------------------------------------------------------------
 # Sample generation per cycle
 #
@@ -26,12 +26,15 @@ def _format_per_type_table(snapshots: list[MetricsSnapshot]) -> str:
     header = "| Category | " + " | ".join(labels) + " | Delta |"
     separator = "|" + "---|" * (len(snapshots) + 2)
 
+    # One format template per row instead of an f-string per cell
+    row_fmt = "| {} | " + " | ".join(["{:.4f}"] * len(snapshots)) + " | {:+.4f} |"
+    per_type = [s.per_type for s in snapshots]
+
     rows = []
     for rt in RULE_TYPES:
-        values = [s.per_type.get(rt, 0.0) for s in snapshots]
+        values = [pt.get(rt, 0.0) for pt in per_type]
         delta = values[-1] - values[0] if len(values) > 1 else 0.0
-        cells = " | ".join(f"{v:.4f}" for v in values)
-        rows.append(f"| {rt} | {cells} | {delta:+.4f} |")
+        rows.append(row_fmt.format(rt, *values, delta))
 
     return f"{header}\n{separator}\n" + "\n".join(rows)
 
@@ -41,13 +44,14 @@ def _format_composite_progression(snapshots: list[MetricsSnapshot]) -> str:
     lines = ["| Cycle | Composite | Schema | Fields | F1 | Source | Min Type |"]
     lines.append("|---|---|---|---|---|---|---|")
 
-    for i, s in enumerate(snapshots):
-        min_type = min(s.per_type.values()) if s.per_type else 0.0
-        lines.append(
-            f"| {i} | {s.composite:.4f} | {s.schema_validity_rate:.4f} | "
-            f"{s.field_accuracy:.4f} | {s.rule_detection_f1:.4f} | "
-            f"{s.source_text_overlap:.4f} | {min_type:.4f} |"
+    row_fmt = "| {} | {:.4f} | {:.4f} | {:.4f} | {:.4f} | {:.4f} | {:.4f} |"
+    lines.extend(
+        row_fmt.format(
+            i, s.composite, s.schema_validity_rate, s.field_accuracy, s.rule_detection_f1,
+            s.source_text_overlap, min(s.per_type.values()) if s.per_type else 0.0,
         )
+        for i, s in enumerate(snapshots)
+    )
 
     return "\n".join(lines)
 
@@ -118,10 +122,14 @@ def build_report_markdown(
         if comp.regressions:
             regressions_str = ", ".join(f"{r.name} ({r.delta:+.4f})" for r in comp.regressions)
 
+        # Resolve the target's lookups once; missing category/delta fall back to 0.0
+        target_cat = meta.get("target_category", "")
+        target_md = comp.per_type_deltas.get(target_cat)
+
         sections.append(REPORT_SECTION_CYCLE.format(
             cycle_num=i + 1,
             target_category=meta.get("target_category", "unknown"),
-            target_accuracy_before=before.per_type.get(meta.get("target_category", ""), 0.0),
+            target_accuracy_before=before.per_type.get(target_cat, 0.0),
             dominant_failure=meta.get("dominant_failure", "unknown"),
             samples_generated=meta.get("samples_generated", 0),
             dataset_version=meta.get("dataset_version", i + 1),
@@ -137,8 +145,8 @@ def build_report_markdown(
             f1_before=before.rule_detection_f1,
             f1_after=after.rule_detection_f1,
             f1_delta=comp.f1_delta,
-            target_accuracy_after=after.per_type.get(meta.get("target_category", ""), 0.0),
-            target_delta=getattr(comp.per_type_deltas.get(meta.get("target_category", "")), "delta", 0.0),
+            target_accuracy_after=after.per_type.get(target_cat, 0.0),
+            target_delta=target_md.delta if target_md is not None else 0.0,
             regressions=regressions_str,
         ))
 
@@ -180,15 +188,20 @@ def create_wandb_report(
     cycle_metadata: list[dict],
     project: str | None = None,
     entity: str | None = None,
+    markdown: str | None = None,
 ) -> str:
-    """Create a W&B Report via wandb-workspaces SDK. Returns the report URL."""
+    """Create a W&B Report via wandb-workspaces SDK. Returns the report URL.
+
+    Pass markdown from build_report_markdown to avoid rebuilding it.
+    """
     import wandb_workspaces.reports.v2 as wr
 
     entity = entity or WANDB_ENTITY
     project = project or WANDB_PROJECT
     n_cycles = len(cycle_comparisons)
 
-    markdown = build_report_markdown(cycle_snapshots, cycle_comparisons, cycle_metadata)
+    if markdown is None:
+        markdown = build_report_markdown(cycle_snapshots, cycle_comparisons, cycle_metadata)
     title = REPORT_TITLE_TEMPLATE.format(n_cycles=n_cycles)
 
     report = wr.Report(
@@ -233,13 +246,16 @@ def get_mcp_report_payload(
     cycle_snapshots: list[MetricsSnapshot],
     cycle_comparisons: list[RunComparison],
     cycle_metadata: list[dict],
+    markdown: str | None = None,
 ) -> dict:
     """Return the payload for the W&B MCP create_wandb_report_tool.
 
-    Use this when calling the MCP Server instead of the Python SDK.
+    Use this when calling the MCP Server instead of the Python SDK. Pass
+    markdown from build_report_markdown to avoid rebuilding it.
     """
     n_cycles = len(cycle_comparisons)
-    markdown = build_report_markdown(cycle_snapshots, cycle_comparisons, cycle_metadata)
+    if markdown is None:
+        markdown = build_report_markdown(cycle_snapshots, cycle_comparisons, cycle_metadata)
 
     return {
         "entity_name": WANDB_ENTITY or "<your-entity>",
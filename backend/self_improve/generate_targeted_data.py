@@ -7,15 +7,24 @@ and dominant failure mode.
 
 from __future__ import annotations
 
-import json
+import asyncio
+import bisect
+import functools
+import hashlib
 import os
 import random
+import sqlite3
 import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
 from pathlib import Path
 
 from google import genai
+import fastjsonschema
 import jsonschema
-from tenacity import retry, stop_after_attempt, wait_exponential
+import orjson
 
 from self_improve.config import (
     BASE_SAMPLES_PER_CYCLE,
@@ -30,24 +39,103 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from data.field_vocabulary import CANONICAL_FIELDS, format_field_list
 from data.generation_script import (
     COMPLEXITIES,
-    CONFIDENCE_WEIGHTS,
     CONDITION_LOGIC_WEIGHTS,
+    CONFIDENCE_WEIGHTS,
+    CONTRASTIVE_TYPES,
+    GEN_MAX_ATTEMPTS,
     JURISDICTION_MIXES,
     OPERATOR_HINTS,
     TOPICS,
     WRITING_STYLES,
     build_prompt,
     parse_response,
+    retry_delay,
     to_mistral_format,
-    validate_sample,
 )
 
 SCHEMA_PATH = Path(__file__).parent.parent / "schema" / "decision_logic.json"
 
+# Validated Gemini responses, so re-running or resuming a cycle skips the API
+GEN_CACHE_PATH = Path(__file__).parent.parent / "data" / ".gen_cache.sqlite"
+
+# Gemini requests in flight at once during a cycle
+GEN_CONCURRENCY = 16
+
+# Parse + schema validation moves to worker processes for batches at least
+# this large; below it, process startup costs more than the GIL contention.
+PROCESS_VALIDATION_MIN_JOBS = 32
+VALIDATION_WORKERS = os.cpu_count() or 1
+
 
+@functools.lru_cache(maxsize=1)
 def _load_schema() -> dict:
-    with open(SCHEMA_PATH) as f:
-        return json.load(f)
+    """Parsed decision_logic schema, read once per process. Don't mutate it."""
+    return orjson.loads(SCHEMA_PATH.read_bytes())
+
+
+@functools.lru_cache(maxsize=1)
+def _schema_validators():
+    """(fastjsonschema check, jsonschema validator), compiled once per process."""
+    schema = _load_schema()
+    return fastjsonschema.compile(schema), jsonschema.validators.validator_for(schema)(schema)
+
+
+@functools.lru_cache(maxsize=1)
+def _required_keys() -> tuple[tuple[str, ...], frozenset[str], tuple[str, ...], frozenset[str]]:
+    """Top-level and per-rule required keys, in schema order and as sets."""
+    schema = _load_schema()
+    top = tuple(schema.get("required", ()))
+    rule = tuple(schema["properties"]["rules"]["items"].get("required", ()))
+    return top, frozenset(top), rule, frozenset(rule)
+
+
+def _missing_required(extraction: dict) -> str | None:
+    """Message for the first missing required key, or None if all are present.
+
+    Missing keys are the usual way generated extractions fail, and a set
+    check settles those without running either schema validator.
+    """
+    if not isinstance(extraction, dict):
+        return None  # leave type errors to the schema validators
+    top, top_set, rule_keys, rule_set = _required_keys()
+    if not extraction.keys() >= top_set:
+        missing = next(k for k in top if k not in extraction)
+        return f"{missing!r} is a required property"
+    rules = extraction["rules"]
+    if isinstance(rules, list):
+        for rule in rules:
+            if isinstance(rule, dict) and not rule.keys() >= rule_set:
+                missing = next(k for k in rule_keys if k not in rule)
+                return f"{missing!r} is a required property"
+    return None
+
+
+def _validate_sample(policy_text: str, extraction: dict) -> list[str]:
+    """generation_script.validate_sample against precompiled validators.
+
+    A required-key check runs first; otherwise the generated fastjsonschema
+    check decides validity and jsonschema's best_match only runs for failing
+    samples, so messages stay the same.
+    """
+    errors = []
+    missing = _missing_required(extraction)
+    if missing is not None:
+        errors.append(f"schema: {missing}")
+    else:
+        fast_check, validator = _schema_validators()
+        try:
+            fast_check(extraction)
+        except fastjsonschema.JsonSchemaException:
+            error = jsonschema.exceptions.best_match(validator.iter_errors(extraction))
+            if error is not None:
+                errors.append(f"schema: {error.message}")
+
+    for i, rule in enumerate(extraction.get("rules", [])):
+        src = rule.get("source_text", "")
+        if src and src not in policy_text:
+            errors.append(f"rule {i} source_text not verbatim in policy")
+
+    return errors
 
 
 def samples_for_cycle(cycle_num: int) -> int:
@@ -55,6 +143,20 @@ def samples_for_cycle(cycle_num: int) -> int:
     return min(n, MAX_SAMPLES_PER_CYCLE)
 
 
+# Populations and cumulative weights for _weighted_pick, built once rather than per spec
+_CONFIDENCE_KEYS = tuple(CONFIDENCE_WEIGHTS)
+_CONFIDENCE_CUM = tuple(accumulate(CONFIDENCE_WEIGHTS.values()))
+_LOGIC_KEYS = tuple(CONDITION_LOGIC_WEIGHTS)
+_LOGIC_CUM = tuple(accumulate(CONDITION_LOGIC_WEIGHTS.values()))
+# Mixed-jurisdiction policies are harder; bias targeted samples toward them.
+_JURIS_CUM_TARGETED = tuple(accumulate([0.25, 0.25, 0.50]))
+_JURIS_CUM_OTHER = tuple(accumulate([0.33, 0.33, 0.34]))
+# CONTRASTIVE_TYPES is (clear, ambiguous); the failure mode decides which side is favoured
+_CONTRASTIVE_CUM_CLEAR = tuple(accumulate([0.7, 0.3]))
+_CONTRASTIVE_CUM_AMBIGUOUS = tuple(accumulate([0.3, 0.7]))
+# Redraws allowed when a spec duplicates one already in the batch
+SPEC_REDRAWS = 5
+
 RULE_TYPE_TOPIC_AFFINITY = {
     "entitlement": ["final_paycheck", "meal_breaks", "pfl_fmla"],
     "restriction": ["warn", "overtime", "meal_breaks"],
@@ -65,16 +167,45 @@ RULE_TYPE_TOPIC_AFFINITY = {
 }
 
 
+def _weighted_pick(rng: random.Random, population, cum_weights: tuple[float, ...]):
+    """rng.choices(population, cum_weights=cum_weights)[0] without its per-call setup.
+
+    Consumes one rng.random() and bisects the same way, so seeded draws match.
+    """
+    return population[bisect.bisect(cum_weights, rng.random() * cum_weights[-1], 0, len(cum_weights) - 1)]
+
+
+def _spec_key(spec: dict) -> tuple:
+    """Canonical form of the sampled attributes that shape a generated policy."""
+    return (
+        spec["topic"]["id"],
+        spec["rule_type"],
+        spec["style"]["id"],
+        spec["jurisdiction"]["id"],
+        spec["complexity"]["id"],
+        spec["contrastive"]["id"],
+        spec["confidence_hint"],
+        spec["logic_hint"],
+        spec["operator_hint"],
+    )
+
+
 def build_targeted_specs(
     target_category: str,
     dominant_failure: str,
     n_samples: int,
     seed: int = 42,
-) -> list[dict]:
+) -> tuple[list[dict], Counter]:
     """Build a coverage matrix biased toward the weak category and failure mode.
 
+    Returns (specs, rule_type counts); the counts are tallied as specs are
+    accepted so callers don't walk the list again to report them.
+
     Distribution: 60% target category, 25% adjacent rule_types, 15% other
     (prevents catastrophic forgetting while focusing on the weak area).
+
+    Specs whose sampled attributes repeat an earlier spec are redrawn up to
+    SPEC_REDRAWS times, so the batch doesn't pay for near-identical policies.
     """
     rng = random.Random(seed)
 
@@ -87,7 +218,16 @@ def build_targeted_specs(
     contrastive_bias = fm_strategy.get("contrastive_bias", "clear")
 
     # Flip weights based on failure mode so contrastive type aligns with what's hard.
-    contrastive_weights = [0.3, 0.7] if contrastive_bias == "ambiguous" else [0.7, 0.3]
+    contrastive_cum = _CONTRASTIVE_CUM_AMBIGUOUS if contrastive_bias == "ambiguous" else _CONTRASTIVE_CUM_CLEAR
+
+    # Append failure-mode guidance so targeted samples stress the exact weakness.
+    # fm_instruction is fixed for the call, so the variants are built once and shared.
+    targeted_contrastive = CONTRASTIVE_TYPES
+    if fm_instruction:
+        targeted_contrastive = [
+            {"id": c["id"], "instruction": f"{c['instruction']} Additionally: {fm_instruction}"}
+            for c in CONTRASTIVE_TYPES
+        ]
 
     preferred_topics = RULE_TYPE_TOPIC_AFFINITY.get(target_category, [t["id"] for t in TOPICS])
     topic_by_id = {t["id"]: t for t in TOPICS}
@@ -95,11 +235,11 @@ def build_targeted_specs(
     adjacent_types = [rt for rt in RULE_TYPES if rt != target_category]
 
     specs = []
+    rt_dist = Counter()
+    seen: set[tuple] = set()
     spec_id = 0
 
     def make_spec(rule_type: str, is_targeted: bool) -> dict:
-        nonlocal spec_id
-
         if is_targeted and preferred_topics:
             topic_id = rng.choice(preferred_topics)
             topic = topic_by_id.get(topic_id, rng.choice(TOPICS))
@@ -108,9 +248,8 @@ def build_targeted_specs(
 
         style = rng.choice(WRITING_STYLES)
 
-        # Mixed-jurisdiction policies are harder; bias targeted samples toward them.
-        juris_weights = [0.25, 0.25, 0.50] if is_targeted else [0.33, 0.33, 0.34]
-        juris = rng.choices(JURISDICTION_MIXES, weights=juris_weights, k=1)[0]
+        juris_cum = _JURIS_CUM_TARGETED if is_targeted else _JURIS_CUM_OTHER
+        juris = _weighted_pick(rng, JURISDICTION_MIXES, juris_cum)
 
         # Multi-rule paragraphs are the natural stress-test for missing/hallucinated rules.
         if dominant_failure in ("missing_rule", "hallucinated_rule"):
@@ -118,30 +257,12 @@ def build_targeted_specs(
         else:
             complexity = rng.choice(COMPLEXITIES)
 
-        contrastive = rng.choices(
-            [{"id": "clear", "instruction": "Make the policy language clear and unambiguous. The rules should be easy to extract."},
-             {"id": "ambiguous", "instruction": "Make the policy language somewhat ambiguous or convoluted. Include conditional clauses, exceptions, and cross-references that make extraction harder. The model should still extract the most reasonable interpretation."}],
-            weights=contrastive_weights,
-            k=1,
-        )[0]
-
-        # Append failure-mode guidance so targeted samples stress the exact weakness.
-        if is_targeted and fm_instruction:
-            contrastive = {
-                "id": contrastive["id"],
-                "instruction": f"{contrastive['instruction']} Additionally: {fm_instruction}",
-            }
-
-        confidence_hint = rng.choices(
-            list(CONFIDENCE_WEIGHTS.keys()),
-            weights=list(CONFIDENCE_WEIGHTS.values()),
-            k=1,
-        )[0]
-        logic_hint = rng.choices(
-            list(CONDITION_LOGIC_WEIGHTS.keys()),
-            weights=list(CONDITION_LOGIC_WEIGHTS.values()),
-            k=1,
-        )[0]
+        contrastive = _weighted_pick(
+            rng, targeted_contrastive if is_targeted else CONTRASTIVE_TYPES, contrastive_cum
+        )
+
+        confidence_hint = _weighted_pick(rng, _CONFIDENCE_KEYS, _CONFIDENCE_CUM)
+        logic_hint = _weighted_pick(rng, _LOGIC_KEYS, _LOGIC_CUM)
 
         pos_in_batch = spec_id % 30
         operator_hint = OPERATOR_HINTS[pos_in_batch] if pos_in_batch < len(OPERATOR_HINTS) else None
@@ -161,31 +282,149 @@ def build_targeted_specs(
             "target_category": target_category,
             "dominant_failure": dominant_failure,
         }
-        spec_id += 1
         return spec
 
+    def add_spec(rule_type: str, is_targeted: bool):
+        nonlocal spec_id
+        for _ in range(1 + SPEC_REDRAWS):
+            spec = make_spec(rule_type, is_targeted)
+            key = _spec_key(spec)
+            if key not in seen:
+                break
+        # After SPEC_REDRAWS collisions the last draw is kept as-is
+        seen.add(key)
+        specs.append(spec)
+        rt_dist[rule_type] += 1
+        spec_id += 1
+
     for _ in range(n_target):
-        specs.append(make_spec(target_category, is_targeted=True))
+        add_spec(target_category, is_targeted=True)
 
     for _ in range(n_adjacent):
-        rt = rng.choice(adjacent_types)
-        specs.append(make_spec(rt, is_targeted=False))
+        add_spec(rng.choice(adjacent_types), is_targeted=False)
 
     for _ in range(n_other):
-        rt = rng.choice(RULE_TYPES)
-        specs.append(make_spec(rt, is_targeted=False))
+        add_spec(rng.choice(RULE_TYPES), is_targeted=False)
 
     rng.shuffle(specs)
-    return specs
+    return specs, rt_dist
+
+
+async def _agenerate_single(
+    client: genai.Client, model: str, prompt: str, sem: asyncio.Semaphore
+) -> str:
+    async with sem:
+        for attempt in range(GEN_MAX_ATTEMPTS):
+            try:
+                response = await client.aio.models.generate_content(
+                    model=model,
+                    contents=prompt,
+                )
+                return response.text
+            except Exception:
+                if attempt == GEN_MAX_ATTEMPTS - 1:
+                    raise
+                await asyncio.sleep(retry_delay(attempt, min_wait=2.0))
+
+
+def _init_validation_worker():
+    _schema_validators()  # compile once per worker rather than on its first sample
+
+
+def _check_response(text: str) -> tuple[dict | None, str]:
+    """Parse and validate one response. Returns (training sample or None, status)."""
+    policy_text, extraction, err = parse_response(text)
+    if err:
+        return None, f"PARSE ERROR: {err}"
+
+    errors = _validate_sample(policy_text, extraction)
+    if errors:
+        return None, f"VALIDATION: {errors[0]}"
+
+    n_rules = len(extraction.get("rules", []))
+    return to_mistral_format(policy_text, extraction), f"OK ({n_rules} rules)"
+
+
+async def _generate_one(
+    client: genai.Client,
+    model: str,
+    prompt: str,
+    cached_text: str | None,
+    sem: asyncio.Semaphore,
+    pool: ProcessPoolExecutor | None = None,
+    cache: sqlite3.Connection | None = None,
+    key: str | None = None,
+) -> tuple[dict | None, str, str | None]:
+    """Returns (sample or None, status, response text).
+
+    Validation runs on pool when given, otherwise on the default thread
+    pool; either way it overlaps requests still in flight. A new response
+    that validates is committed to cache under key straight away, so an
+    interrupted cycle keeps what it already paid for.
+    """
+    try:
+        text = cached_text
+        if text is None:
+            text = await _agenerate_single(client, model, prompt, sem)
+        loop = asyncio.get_running_loop()
+        sample, status = await loop.run_in_executor(pool, _check_response, text)
+    except Exception as e:
+        return None, f"ERROR: {e}", None
+    if sample is not None and cached_text is None and cache is not None:
+        with cache:
+            cache.execute(
+                "INSERT OR REPLACE INTO generations (key, text, created_at) VALUES (?, ?, ?)",
+                (key, text, int(time.time())),
+            )
+    return sample, status, text
+
+
+async def _generate_all(
+    client: genai.Client,
+    model: str,
+    jobs: list[tuple[str, str | None, str]],
+    cache: sqlite3.Connection | None = None,
+) -> list[tuple[dict | None, str, str | None]]:
+    sem = asyncio.Semaphore(GEN_CONCURRENCY)
+    pool = None
+    if len(jobs) >= PROCESS_VALIDATION_MIN_JOBS and VALIDATION_WORKERS > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=VALIDATION_WORKERS, initializer=_init_validation_worker
+        )
+    try:
+        return await asyncio.gather(
+            *(
+                _generate_one(client, model, prompt, cached, sem, pool, cache, key)
+                for prompt, cached, key in jobs
+            )
+        )
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def _open_gen_cache() -> sqlite3.Connection:
+    conn = sqlite3.connect(GEN_CACHE_PATH)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS generations ("
+        "key TEXT PRIMARY KEY, text TEXT NOT NULL, created_at INTEGER NOT NULL)"
+    )
+    # Digests of rows append_to_training_data has written, per training file
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS appended_rows ("
+        "path TEXT NOT NULL, digest TEXT NOT NULL, PRIMARY KEY (path, digest))"
+    )
+    return conn
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(min=2, max=30))
-def _generate_single(client: genai.Client, model: str, prompt: str) -> str:
-    response = client.models.generate_content(
-        model=model,
-        contents=prompt,
-    )
-    return response.text
+def _gen_cache_key(model: str, salt: str, prompt: str) -> str:
+    """Key on the spec's identity as well as the prompt.
+
+    Two specs can render the same prompt; keying on the prompt alone would
+    hand both the same response and duplicate rows in the training set.
+    """
+    return hashlib.blake2b(f"{model}\n{salt}\n{prompt}".encode(), digest_size=16).hexdigest()
 
 
 def generate_targeted_samples(
@@ -203,13 +442,8 @@ def generate_targeted_samples(
     print(f"  Dominant failure: {dominant_failure}")
     print(f"  Failure strategy: {FAILURE_MODE_STRATEGIES.get(dominant_failure, {}).get('instruction', 'default')[:80]}...")
 
-    specs = build_targeted_specs(target_category, dominant_failure, n_samples, seed + cycle_num)
-
-    rt_dist = {}
-    for s in specs:
-        rt = s["rule_type"]
-        rt_dist[rt] = rt_dist.get(rt, 0) + 1
-    print(f"  Rule type distribution: {rt_dist}")
+    specs, rt_dist = build_targeted_specs(target_category, dominant_failure, n_samples, seed + cycle_num)
+    print(f"  Rule type distribution: {dict(rt_dist)}")
 
     if dry_run:
         print(f"  DRY RUN — would generate {n_samples} samples")
@@ -217,8 +451,6 @@ def generate_targeted_samples(
         print(f"    {build_prompt(specs[0])[:200]}...")
         return []
 
-    schema = _load_schema()
-
     api_key = os.environ.get("GEMINI_API_KEY")
     if not api_key:
         env_path = Path(__file__).parent.parent / ".env"
@@ -230,53 +462,128 @@ def generate_targeted_samples(
         raise ValueError("GEMINI_API_KEY not set")
 
     client = genai.Client(api_key=api_key)
+    cache = _open_gen_cache()
+
+    jobs = []
+    for spec in specs:
+        prompt = build_prompt(spec)
+        key = _gen_cache_key(model, f"{seed + cycle_num}:{spec['id']}", prompt)
+        row = cache.execute("SELECT text FROM generations WHERE key = ?", (key,)).fetchone()
+        jobs.append((prompt, row[0] if row else None, key))
+
+    n_cached = sum(1 for _, cached, _ in jobs if cached is not None)
+    print(f"  Requesting {n_samples - n_cached} generations ({GEN_CONCURRENCY} concurrent, {n_cached} cached)...")
+    try:
+        results = asyncio.run(_generate_all(client, model, jobs, cache))
+    finally:
+        cache.close()
 
     valid_samples = []
     failed = 0
 
-    for i, spec in enumerate(specs):
-        prompt = build_prompt(spec)
-        print(f"  [{i+1}/{n_samples}] {spec['id']} (type={spec['rule_type']}, topic={spec['topic']['id']})...", end=" ", flush=True)
-
-        try:
-            text = _generate_single(client, model, prompt)
-            policy_text, extraction, err = parse_response(text)
-
-            if err:
-                print(f"PARSE ERROR: {err}")
-                failed += 1
-                continue
-
-            errors = validate_sample(policy_text, extraction, schema)
-            if errors:
-                print(f"VALIDATION: {errors[0]}")
-                failed += 1
-                continue
-
-            valid_samples.append(to_mistral_format(policy_text, extraction))
-            n_rules = len(extraction.get("rules", []))
-            print(f"OK ({n_rules} rules)")
-
-        except Exception as e:
-            print(f"ERROR: {e}")
+    # Report in spec order once everything has come back
+    for i, (spec, (_, cached, _), (sample, status, _)) in enumerate(zip(specs, jobs, results)):
+        if sample is None:
             failed += 1
+        else:
+            valid_samples.append(sample)
+            if cached is not None:
+                status += " [cached]"
+        print(f"  [{i+1}/{n_samples}] {spec['id']} (type={spec['rule_type']}, topic={spec['topic']['id']})... {status}")
 
     print(f"\n  Generated: {len(valid_samples)} valid, {failed} failed")
     return valid_samples
 
 
-def append_to_training_data(new_samples: list[dict], train_path: str | None = None):
-    path = Path(train_path or TRAIN_JSONL)
+def _count_path(path: Path) -> Path:
+    return path.with_suffix(".count")
+
+
+def _read_line_count(path: Path) -> int:
+    """Non-empty lines in path, taken from the sidecar while it matches the file size."""
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return 0
+    try:
+        count, recorded_size = map(int, _count_path(path).read_text().split())
+        if recorded_size == size:
+            return count
+    except (OSError, ValueError):
+        pass
+    # Missing sidecar or the file was rewritten elsewhere (e.g. correction merges)
+    with open(path, "rb") as f:
+        return sum(1 for line in f if line.strip())
+
 
-    existing_count = 0
-    if path.exists():
-        with open(path) as f:
-            existing_count = sum(1 for line in f if line.strip())
+def _write_line_count(path: Path, count: int):
+    sidecar = _count_path(path)
+    tmp = sidecar.with_suffix(".count.tmp")
+    tmp.write_text(f"{count} {path.stat().st_size}\n")
+    os.replace(tmp, sidecar)
 
-    with open(path, "a") as f:
-        for sample in new_samples:
-            f.write(json.dumps(sample) + "\n")
 
-    new_count = existing_count + len(new_samples)
-    print(f"  Appended {len(new_samples)} samples to {path} (total: {new_count})")
+def _row_digest(row: bytes) -> str:
+    return hashlib.blake2b(row, digest_size=16).hexdigest()
+
+
+def _already_appended(path: str, digests: list[str], cache: sqlite3.Connection) -> set[str]:
+    """Those of digests whose rows an earlier append wrote to path and are still in it.
+
+    The ledger only narrows the check: a hit is confirmed against the file,
+    which may have been rewritten or reset since.
+    """
+    ledger = {d for (d,) in cache.execute("SELECT digest FROM appended_rows WHERE path = ?", (path,))}
+    hits = ledger.intersection(digests)
+    if not hits:
+        return hits
+    try:
+        with open(path, "rb") as f:
+            present = {_row_digest(line.rstrip(b"\n")) for line in f}
+    except FileNotFoundError:
+        return set()
+    return hits & present
+
+
+def append_to_training_data(new_samples: list[dict], train_path: str | None = None):
+    """Append samples to the training JSONL, skipping rows an earlier append already wrote.
+
+    Re-running a finished cycle replays its cached generations, which would
+    otherwise add the same rows again.
+    """
+    path = Path(train_path or TRAIN_JSONL)
+
+    existing_count = _read_line_count(path)
+
+    ledger_path = str(path.resolve())
+    rows = [orjson.dumps(sample) for sample in new_samples]
+    digests = [_row_digest(row) for row in rows]
+    cache = _open_gen_cache()
+    try:
+        duplicates = _already_appended(ledger_path, digests, cache)
+        if duplicates:
+            kept = [(row, d) for row, d in zip(rows, digests) if d not in duplicates]
+            print(f"  Skipping {len(rows) - len(kept)} samples already in {path}")
+            rows = [row for row, _ in kept]
+            digests = [d for _, d in kept]
+
+        payload = memoryview(b"".join(row + b"\n" for row in rows))
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            while payload:
+                payload = payload[os.write(fd, payload):]
+        finally:
+            os.close(fd)
+
+        with cache:
+            cache.executemany(
+                "INSERT OR IGNORE INTO appended_rows (path, digest) VALUES (?, ?)",
+                [(ledger_path, d) for d in digests],
+            )
+    finally:
+        cache.close()
+
+    new_count = existing_count + len(rows)
+    _write_line_count(path, new_count)
+    print(f"  Appended {len(rows)} samples to {path} (total: {new_count})")
     return new_count
@@ -1,7 +1,8 @@
 """Pull and analyze metrics from W&B runs.
 
 Two modes:
-  1. Direct SDK mode — uses wandb.Api() for standalone execution
+  1. Direct mode — uses wandb.Api() for single runs and one GraphQL query
+     per page of a run listing (self_improve.wandb_gql) for standalone execution
   2. MCP mode — outputs GraphQL queries for the W&B MCP Server
 
 Both produce the same MetricsSnapshot dataclass.
@@ -9,10 +10,18 @@ Both produce the same MetricsSnapshot dataclass.
 
 from __future__ import annotations
 
-import json
+import heapq
+import os
+import pickle
+import time
 from dataclasses import dataclass, field
+from datetime import datetime
+from operator import itemgetter
+from pathlib import Path
 from typing import Any
 
+import orjson
+
 from self_improve.config import (
     CATEGORY_FLOOR,
     COMPOSITE_WEIGHTS,
@@ -20,13 +29,59 @@ from self_improve.config import (
     FAILURE_MODES,
     RULE_TYPE_METRIC_PREFIX,
     RULE_TYPES,
-    TARGET_ACCURACY,
     WANDB_ENTITY,
     WANDB_PROJECT,
 )
+from self_improve import wandb_gql
+from self_improve.targeting import expected_improvement
+
+# Summary keys per rule type / failure mode, most preferred first. Built once
+# so parse_summary_metrics doesn't format key strings for every run.
+_PER_TYPE_KEYS = tuple(
+    (rt, tuple(dict.fromkeys((f"{RULE_TYPE_METRIC_PREFIX}{rt}", f"eval/per_type/{rt}", f"per_type_{rt}"))))
+    for rt in RULE_TYPES
+)
+_FAILURE_KEYS = tuple((fm, f"failure_modes/{fm}", f"failures/{fm}") for fm in FAILURE_MODES)
+
+# COMPOSITE_WEIGHTS as (name, weight) pairs; every name except
+# min_per_type_accuracy is a MetricsSnapshot attribute.
+_COMPOSITE_WEIGHT_ITEMS = tuple(COMPOSITE_WEIGHTS.items())
+
+# Every summary key parse_summary_metrics reads. Fetches copy only these out
+# of run.summary rather than decoding every logged value with dict().
+SUMMARY_KEYS = tuple(dict.fromkeys((
+    "eval/schema_validity_rate", "schema_validity_rate",
+    "eval/field_accuracy", "avg_field_accuracy",
+    "eval/f1", "avg_f1",
+    "eval/source_overlap", "avg_source_overlap",
+    "eval/avg_latency_ms", "avg_latency_ms",
+    *(k for _, keys in _PER_TYPE_KEYS for k in keys),
+    *(k for _, primary, fallback in _FAILURE_KEYS for k in (primary, fallback)),
+)))
+
+# A run counts as an eval run if its (projected) summary holds any of these.
+# Fetched summaries only contain SUMMARY_KEYS, so probing these is the same
+# test as scanning for any "eval/" key or schema_validity_rate.
+_EVAL_PROBE_KEYS = tuple(k for k in SUMMARY_KEYS if k.startswith("eval/")) + ("schema_validity_rate",)
+
+# Sort key for (name, value) pairs
+_BY_VALUE = itemgetter(1)
+
+# Snapshots of finished runs never change, so they are pickled and shared across processes
+SNAPSHOT_CACHE_DIR = Path.home() / ".cache" / "redline" / "snapshots"
+_SNAPSHOT_CACHE_VERSION = 3
+
+# Last snapshot returned by fetch_latest_run per (entity, project)
+_LATEST_SNAPSHOTS: dict[tuple[str, str], MetricsSnapshot] = {}
 
+# Finished-run snapshots already read or written this process, by cache path
+_RUN_SNAPSHOTS: dict[Path, MetricsSnapshot] = {}
 
-@dataclass
+# Shared W&B client, created on first use (see _get_api)
+_API = None
+
+
+@dataclass(slots=True)
 class MetricsSnapshot:
     """All metrics from a single W&B eval run."""
 
@@ -50,61 +105,99 @@ class MetricsSnapshot:
     # Composite score
     composite: float = 0.0
 
-    # Raw summary metrics dict from W&B
+    # Summary metrics from W&B (only SUMMARY_KEYS); empty unless parsed with keep_raw
     raw: dict[str, Any] = field(default_factory=dict)
 
+    # (category, accuracy) of the weakest rule type; set by compute_composite
+    _weakest: tuple[str, float] | None = field(default=None, init=False, repr=False, compare=False)
+
     def weakest_category(self) -> tuple[str, float]:
-        """Return (category_name, accuracy) of the worst-performing rule type."""
-        if not self.per_type:
-            return ("unknown", 0.0)
-        return min(self.per_type.items(), key=lambda x: x[1])
+        """Return (category_name, accuracy) of the worst-performing rule type.
 
-    def categories_below_floor(self) -> list[tuple[str, float]]:
-        """Return categories below CATEGORY_FLOOR, sorted ascending."""
-        below = [(k, v) for k, v in self.per_type.items() if v < CATEGORY_FLOOR]
-        return sorted(below, key=lambda x: x[1])
+        Cached on first use. compute_composite refreshes it, so call that
+        after editing per_type.
+        """
+        if self._weakest is None:
+            self._weakest = _weakest_of(self.per_type)
+        return self._weakest
+
+    def categories_below_floor(self, k: int | None = None) -> list[tuple[str, float]]:
+        """Return categories below CATEGORY_FLOOR, sorted ascending.
+
+        With k, only the k lowest are returned, selected with a heap rather
+        than a full sort.
+        """
+        below = [(rt, v) for rt, v in self.per_type.items() if v < CATEGORY_FLOOR]
+        if k is not None:
+            return heapq.nsmallest(k, below, key=_BY_VALUE)
+        return sorted(below, key=_BY_VALUE)
 
     def dominant_failure_mode(self, category: str | None = None) -> str:
-        """Return the most frequent failure mode."""
+        """Return the most frequent failure mode.
+
+        Single pass over the counts; ties go to the earliest mode, as before.
+        """
         if not self.failure_modes:
             return "unknown"
-        nonzero = {k: v for k, v in self.failure_modes.items() if v > 0}
-        if not nonzero:
-            return "none"
-        return max(nonzero, key=nonzero.get)
+        best, best_count = "none", 0
+        for mode, count in self.failure_modes.items():
+            if count > best_count:
+                best, best_count = mode, count
+        return best
 
     def expected_improvement(self, category: str, responsiveness: float | None = None) -> float:
         """Expected Improvement heuristic for targeting a category.
 
-        EI(cat) = (TARGET_ACCURACY - current) * responsiveness
-        Higher EI = more room to improve × more likely to respond to data.
+        EI(cat) = EI_posterior(current) * responsiveness
+        Higher EI = more expected room to improve × more likely to respond to data.
         """
         current = self.per_type.get(category, 0.0)
-        gap = max(0.0, TARGET_ACCURACY - current)
         r = responsiveness if responsiveness is not None else DEFAULT_RESPONSIVENESS
-        return gap * r
+        return expected_improvement(current) * r
+
+
+def _weakest_of(per_type: dict[str, float]) -> tuple[str, float]:
+    """Lowest-accuracy (category, accuracy); ties go to the first, like min()."""
+    if not per_type:
+        return ("unknown", 0.0)
+    it = iter(per_type.items())
+    weakest, weakest_val = next(it)
+    for rt, val in it:
+        if val < weakest_val:
+            weakest, weakest_val = rt, val
+    return weakest, weakest_val
 
 
 def compute_composite(snapshot: MetricsSnapshot) -> float:
-    """Compute the weighted composite score."""
-    min_per_type = min(snapshot.per_type.values()) if snapshot.per_type else 0.0
+    """Compute the weighted composite score.
 
-    values = {
-        "schema_validity_rate": snapshot.schema_validity_rate,
-        "field_accuracy": snapshot.field_accuracy,
-        "rule_detection_f1": snapshot.rule_detection_f1,
-        "source_text_overlap": snapshot.source_text_overlap,
-        "min_per_type_accuracy": min_per_type,
-    }
+    The per-type minimum comes from the same scan as weakest_category, which
+    is cached on the snapshot for later callers.
+    """
+    snapshot._weakest = _weakest_of(snapshot.per_type)
+    min_per_type = snapshot._weakest[1]
+
+    return sum(
+        w * (min_per_type if k == "min_per_type_accuracy" else getattr(snapshot, k))
+        for k, w in _COMPOSITE_WEIGHT_ITEMS
+    )
 
-    return sum(COMPOSITE_WEIGHTS[k] * values[k] for k in COMPOSITE_WEIGHTS)
 
+def parse_summary_metrics(
+    run_id: str,
+    run_name: str,
+    created_at: str,
+    summary: dict,
+    keep_raw: bool = False,
+) -> MetricsSnapshot:
+    """Parse a W&B summaryMetrics dict into a MetricsSnapshot.
 
-def parse_summary_metrics(run_id: str, run_name: str, created_at: str, summary: dict) -> MetricsSnapshot:
-    """Parse a W&B summaryMetrics dict into a MetricsSnapshot."""
+    The summary is only kept on snapshot.raw with keep_raw=True; nothing in
+    the loop reads it once the typed fields are filled.
+    """
     # Handle summaryMetrics being a JSON string (from GraphQL)
     if isinstance(summary, str):
-        summary = json.loads(summary)
+        summary = orjson.loads(summary)
 
     def _get(primary: str, fallback: str, default: float = 0.0) -> float:
         v = summary.get(primary)
@@ -116,23 +209,20 @@ def parse_summary_metrics(run_id: str, run_name: str, created_at: str, summary:
     source_overlap = _get("eval/source_overlap", "avg_source_overlap")
     latency = _get("eval/avg_latency_ms", "avg_latency_ms")
 
-    # Per-type accuracy
+    # Per-type accuracy: first non-null of the primary and alternate keys
+    get = summary.get
     per_type = {}
-    for rt in RULE_TYPES:
-        val = summary.get(f"{RULE_TYPE_METRIC_PREFIX}{rt}")
-        if val is not None:
-            per_type[rt] = val
-        else:
-            # Try alternate keys
-            val = summary.get(f"eval/per_type/{rt}", summary.get(f"per_type_{rt}"))
+    for rt, keys in _PER_TYPE_KEYS:
+        for key in keys:
+            val = get(key)
             if val is not None:
                 per_type[rt] = val
+                break
 
     # Failure modes
     failure_modes = {}
-    for fm in FAILURE_MODES:
-        val = summary.get(f"failure_modes/{fm}", summary.get(f"failures/{fm}", 0))
-        failure_modes[fm] = val
+    for fm, primary, fallback in _FAILURE_KEYS:
+        failure_modes[fm] = summary[primary] if primary in summary else get(fallback, 0)
 
     snapshot = MetricsSnapshot(
         run_id=run_id,
@@ -145,40 +235,138 @@ def parse_summary_metrics(run_id: str, run_name: str, created_at: str, summary:
         avg_latency_ms=latency,
         per_type=per_type,
         failure_modes=failure_modes,
-        raw=summary,
+        raw=summary if keep_raw else {},
     )
     snapshot.composite = compute_composite(snapshot)
     return snapshot
 
 
-def fetch_latest_run(project: str | None = None, entity: str | None = None) -> MetricsSnapshot:
-    """Fetch the latest finished eval run from W&B via the Python SDK."""
-    import wandb
+def _read_summary(run) -> dict:
+    """The SUMMARY_KEYS present in run.summary.
 
-    api = wandb.Api()
-    entity = entity or WANDB_ENTITY or api.default_entity
-    project = project or WANDB_PROJECT
+    dict(run.summary) decodes every logged value, including histograms and
+    tables on training runs; those are never read here and could keep the
+    snapshot from pickling into SNAPSHOT_CACHE_DIR.
+    """
+    summary = run.summary
+    return {k: summary[k] for k in SUMMARY_KEYS if k in summary}
+
+
+def _snapshot_cache_path(entity: str, project: str, run_id: str) -> Path:
+    # Bump the version when MetricsSnapshot's pickled layout changes; slotted
+    # instances can't be restored from an older __dict__-based pickle.
+    return SNAPSHOT_CACHE_DIR / f"v{_SNAPSHOT_CACHE_VERSION}" / entity / project / f"{run_id}.pickle"
 
-    runs = api.runs(
-        f"{entity}/{project}",
-        filters={"state": "finished"},
-        order="-created_at",
-        per_page=1,
-    )
 
+def _read_cached_snapshot(path: Path) -> MetricsSnapshot | None:
+    snapshot = _RUN_SNAPSHOTS.get(path)
+    if snapshot is not None:
+        return snapshot
+    try:
+        snapshot = pickle.loads(path.read_bytes())
+    except Exception:
+        return None  # missing, truncated or written by an incompatible version
+    if not isinstance(snapshot, MetricsSnapshot):
+        return None
+    _RUN_SNAPSHOTS[path] = snapshot
+    return snapshot
+
+
+def _write_cached_snapshot(path: Path, snapshot: MetricsSnapshot):
+    _RUN_SNAPSHOTS[path] = snapshot
+    try:
+        data = pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except Exception:
+        pass  # caching is best-effort; e.g. raw may hold unpicklable W&B objects
+
+
+def _get_api():
+    """Return the process-wide wandb.Api, constructing it on first call.
+
+    Building an Api re-reads credentials and sets up a new GraphQL client,
+    which is most of the cost of a poll. The client keeps its own cache of
+    run lists, so it is flushed on every call to make polls see new runs.
+    """
+    global _API
+    if _API is None:
+        import wandb
+
+        _API = wandb.Api(timeout=30)
+    else:
+        _API.flush()
+    return _API
+
+
+def fetch_latest_run(project: str | None = None, entity: str | None = None) -> MetricsSnapshot:
+    """Fetch the latest finished eval run from W&B.
+
+    The run and its summary come back in one GraphQL request (see
+    self_improve.wandb_gql). When the newest run is the one returned last
+    time, the previous snapshot is reused instead of re-parsing its summary,
+    which is the common case while the loop polls for a new run.
+    """
+    entity = entity or WANDB_ENTITY or _get_api().default_entity
+    project = project or WANDB_PROJECT
+
+    runs = wandb_gql.fetch_runs(entity, project, limit=1, keys=SUMMARY_KEYS)
     if not runs:
         raise ValueError(f"No finished runs found in {entity}/{project}")
 
     run = runs[0]
-    summary = dict(run.summary)
-    return parse_summary_metrics(run.id, run.name, run.created_at, summary)
+    cached = _LATEST_SNAPSHOTS.get((entity, project))
+    if cached is not None and cached.run_id == run["id"]:
+        return cached
+
+    snapshot = parse_summary_metrics(run["id"], run["name"], run["created_at"], run["summary"])
+    _write_cached_snapshot(_snapshot_cache_path(entity, project, run["id"]), snapshot)
+    _LATEST_SNAPSHOTS[(entity, project)] = snapshot
+    return snapshot
+
+
+def wait_for_new_run(
+    current_run_id: str,
+    since: datetime,
+    project: str | None = None,
+    entity: str | None = None,
+    max_wait: float = 1800.0,
+    initial_delay: float = 5.0,
+    max_delay: float = 120.0,
+) -> MetricsSnapshot | None:
+    """Poll for a finished run other than current_run_id created after since.
+
+    Each poll is one GraphQL request over runs created after since that
+    also carries their summaries, so the new run needs no second fetch.
+    Backs off from initial_delay by 1.5x up to max_delay. Returns None if
+    nothing appears within max_wait seconds.
+    """
+    entity = entity or WANDB_ENTITY or _get_api().default_entity
+    project = project or WANDB_PROJECT
+
+    deadline = time.monotonic() + max_wait
+    delay = initial_delay
+    while True:
+        runs = wandb_gql.fetch_runs(entity, project, since=since, limit=5, keys=SUMMARY_KEYS)
+        run = next((r for r in runs if r["id"] != current_run_id), None)
+        if run is not None:
+            snapshot = parse_summary_metrics(run["id"], run["name"], run["created_at"], run["summary"])
+            _write_cached_snapshot(_snapshot_cache_path(entity, project, run["id"]), snapshot)
+            return snapshot
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        print(f"    Waiting for new run... (next check in {min(delay, remaining):.0f}s)")
+        time.sleep(min(delay, remaining))
+        delay = min(max_delay, delay * 1.5)
 
 
 def fetch_run_by_name(run_name: str, project: str | None = None, entity: str | None = None) -> MetricsSnapshot:
     """Fetch a specific run by display name."""
-    import wandb
-
-    api = wandb.Api()
+    api = _get_api()
     entity = entity or WANDB_ENTITY or api.default_entity
     project = project or WANDB_PROJECT
 
@@ -192,44 +380,57 @@ def fetch_run_by_name(run_name: str, project: str | None = None, entity: str | N
         raise ValueError(f"Run '{run_name}' not found in {entity}/{project}")
 
     run = runs[0]
-    summary = dict(run.summary)
+    summary = _read_summary(run)
     return parse_summary_metrics(run.id, run.name, run.created_at, summary)
 
 
-def fetch_run_by_id(run_id: str, project: str | None = None, entity: str | None = None) -> MetricsSnapshot:
-    """Fetch a specific run by W&B run ID."""
-    import wandb
-
-    api = wandb.Api()
-    entity = entity or WANDB_ENTITY or api.default_entity
+def fetch_run_by_id(
+    run_id: str,
+    project: str | None = None,
+    entity: str | None = None,
+    refresh: bool = False,
+) -> MetricsSnapshot:
+    """Fetch a specific run by W&B run ID.
+
+    Finished runs are read from SNAPSHOT_CACHE_DIR when present and written
+    there after the first fetch, so repeated comparisons skip the W&B round-trip.
+    Within a process they are also kept in memory, including runs already
+    returned by fetch_latest_run or wait_for_new_run. refresh=True bypasses
+    both caches and re-reads the run from W&B.
+    """
+    entity = entity or WANDB_ENTITY or _get_api().default_entity
     project = project or WANDB_PROJECT
 
-    run = api.run(f"{entity}/{project}/{run_id}")
-    summary = dict(run.summary)
-    return parse_summary_metrics(run.id, run.name, run.created_at, summary)
+    cache_path = _snapshot_cache_path(entity, project, run_id)
+    if not refresh:
+        cached = _read_cached_snapshot(cache_path)
+        if cached is not None:
+            return cached
+
+    run = _get_api().run(f"{entity}/{project}/{run_id}")
+    summary = _read_summary(run)
+    snapshot = parse_summary_metrics(run.id, run.name, run.created_at, summary)
+    if run.state == "finished":
+        _write_cached_snapshot(cache_path, snapshot)
+    return snapshot
 
 
 def fetch_all_eval_runs(project: str | None = None, entity: str | None = None) -> list[MetricsSnapshot]:
-    """Fetch all finished eval runs, sorted by creation time (newest first)."""
-    import wandb
+    """Fetch all finished eval runs, sorted by creation time (newest first).
 
-    api = wandb.Api()
-    entity = entity or WANDB_ENTITY or api.default_entity
+    Runs and summaries arrive together, one GraphQL request per page of
+    wandb_gql.RUNS_PAGE_SIZE runs.
+    """
+    entity = entity or WANDB_ENTITY or _get_api().default_entity
     project = project or WANDB_PROJECT
 
-    runs = api.runs(
-        f"{entity}/{project}",
-        filters={"state": "finished"},
-        order="-created_at",
-        per_page=50,
-    )
-
     snapshots = []
-    for run in runs:
-        summary = dict(run.summary)
+    for run in wandb_gql.fetch_runs(entity, project, limit=None, keys=SUMMARY_KEYS):
+        summary = run["summary"]
         # Only include runs that have eval metrics
-        if any(k.startswith("eval/") or k == "schema_validity_rate" for k in summary):
-            snapshots.append(parse_summary_metrics(run.id, run.name, run.created_at, summary))
+        if not any(k in summary for k in _EVAL_PROBE_KEYS):
+            continue
+        snapshots.append(parse_summary_metrics(run["id"], run["name"], run["created_at"], summary))
 
     return snapshots
 
@@ -10,12 +10,14 @@ Can run in two modes:
 from __future__ import annotations
 
 import argparse
-import json
-import time
+import os
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+import orjson
+
+from self_improve.bandit import TargetBandit
 from self_improve.compare_runs import RunComparison, compare_runs, print_comparison
 from self_improve.config import (
     CONVERGENCE_DELTA_THRESHOLD,
@@ -37,10 +39,17 @@ from self_improve.inspect_metrics import (
     compute_composite,
     fetch_latest_run,
     print_snapshot,
+    wait_for_new_run,
 )
+from self_improve.targeting import expected_improvement
+
+# Full loop state, rewritten at the start and end of a run; cycles in
+# between are appended to the journal beside it (loop_state.jsonl), which
+# the next run replays if this one never reached its final checkpoint
+LOOP_STATE_PATH = "self_improve/loop_state.json"
 
 
-@dataclass
+@dataclass(slots=True)
 class CycleRecord:
     """Record of a single improvement cycle."""
 
@@ -55,7 +64,7 @@ class CycleRecord:
     status: str = "pending"  # pending, generating, retraining, evaluating, complete, failed, aborted
 
 
-@dataclass
+@dataclass(slots=True)
 class LoopState:
     """Full state of the improvement loop."""
 
@@ -70,60 +79,129 @@ class LoopState:
     # Responsiveness estimates per category (updated after each cycle)
     responsiveness: dict[str, float] = field(default_factory=dict)
 
-    def save(self, path: str = "self_improve/loop_state.json"):
-        """Persist loop state to disk for resumability."""
+    # Saved summaries of cycles from an interrupted run that this one resumes
+    prior_cycles: list[dict] = field(default_factory=list)
+
+    def append_cycle(self, record: CycleRecord, path: str = LOOP_STATE_PATH):
+        """Append one cycle to the journal next to the checkpoint at path.
+
+        Writes a single line, so per-cycle cost doesn't grow with the number
+        of cycles. The current responsiveness estimates and convergence
+        count ride along so a resume from the journal sees them.
+        """
+        entry = {
+            "cycle": _cycle_summary(record),
+            "responsiveness": self.responsiveness,
+            "consecutive_sub_threshold": self.consecutive_sub_threshold,
+        }
+        journal = _journal_path(path)
+        journal.parent.mkdir(parents=True, exist_ok=True)
+        with open(journal, "ab") as f:
+            f.write(orjson.dumps(entry) + b"\n")
+
+    def checkpoint(self, path: str = LOOP_STATE_PATH):
+        """Write the full loop state to path atomically and clear the journal."""
         data = {
-            "cycles": [
-                {
-                    "cycle_num": c.cycle_num,
-                    "target_category": c.target_category,
-                    "dominant_failure": c.dominant_failure,
-                    "samples_generated": c.samples_generated,
-                    "dataset_version": c.dataset_version,
-                    "status": c.status,
-                    "before_run": c.before.run_name if c.before else None,
-                    "after_run": c.after.run_name if c.after else None,
-                }
-                for c in self.cycles
-            ],
+            "cycles": self.prior_cycles + [_cycle_summary(c) for c in self.cycles],
             "consecutive_sub_threshold": self.consecutive_sub_threshold,
             "stop_reason": self.stop_reason,
             "started_at": self.started_at,
             "finished_at": self.finished_at,
             "responsiveness": self.responsiveness,
         }
-        Path(path).parent.mkdir(parents=True, exist_ok=True)
-        with open(path, "w") as f:
-            json.dump(data, f, indent=2)
+        final = Path(path)
+        final.parent.mkdir(parents=True, exist_ok=True)
+        tmp = final.with_name(final.name + ".tmp")
+        tmp.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        os.replace(tmp, final)
+        _journal_path(path).unlink(missing_ok=True)
         print(f"  Loop state saved to {path}")
 
+    @staticmethod
+    def load(path: str = LOOP_STATE_PATH) -> dict:
+        """Read the saved state: the last checkpoint plus any journaled cycles after it.
+
+        Cycles are stored as run names, not snapshots, so this returns the
+        saved dict rather than a LoopState. A journal line cut off by a
+        crash is ignored.
+        """
+        try:
+            data = orjson.loads(Path(path).read_bytes())
+        except FileNotFoundError:
+            data = {"cycles": [], "responsiveness": {}, "consecutive_sub_threshold": 0}
+
+        seen = {c["cycle_num"] for c in data["cycles"]}
+        try:
+            lines = _journal_path(path).read_bytes().splitlines()
+        except FileNotFoundError:
+            lines = []
+        for line in lines:
+            try:
+                entry = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue  # torn final write
+            if entry["cycle"]["cycle_num"] in seen:
+                continue  # already in the checkpoint
+            data["cycles"].append(entry["cycle"])
+            data["responsiveness"] = entry["responsiveness"]
+            data["consecutive_sub_threshold"] = entry.get("consecutive_sub_threshold", 0)
+            seen.add(entry["cycle"]["cycle_num"])
+        return data
+
+
+def _journal_path(path: str) -> Path:
+    return Path(path).with_suffix(".jsonl")
+
+
+def _cycle_summary(c: CycleRecord) -> dict:
+    return {
+        "cycle_num": c.cycle_num,
+        "target_category": c.target_category,
+        "dominant_failure": c.dominant_failure,
+        "samples_generated": c.samples_generated,
+        "dataset_version": c.dataset_version,
+        "status": c.status,
+        "before_run": c.before.run_name if c.before else None,
+        "after_run": c.after.run_name if c.after else None,
+    }
+
 
 def select_target_category(
     snapshot: MetricsSnapshot,
     state: LoopState,
+    verbose: bool = False,
 ) -> tuple[str, float]:
     """Select the category to target using Expected Improvement.
 
-    EI(cat) = (TARGET - current) * responsiveness
+    EI(cat) = EI_posterior(current) * responsiveness
+
+    EI_posterior is the closed-form expected improvement toward TARGET under
+    the binomial SE of the current accuracy (see self_improve.targeting), so
+    a noisy estimate is not treated as exact.
 
     Responsiveness is estimated from previous cycles: if targeting 'leave'
     added 30 samples and accuracy went from 0.40 to 0.55, responsiveness
     for 'leave' is (0.55 - 0.40) / (TARGET - 0.40) ≈ 0.29.
 
     For untargeted categories, use 0.50 as prior.
+
+    With verbose=True, prints the EI breakdown for every category.
     """
     best_category = None
     best_ei = -1.0
+    per_type_get = snapshot.per_type.get
+    responsiveness_get = state.responsiveness.get
 
     for rt in RULE_TYPES:
-        current = snapshot.per_type.get(rt, 0.0)
-        gap = max(0.0, TARGET_ACCURACY - current)
+        current = per_type_get(rt, 0.0)
+        posterior_ei = expected_improvement(current)
 
         # Get responsiveness estimate
-        r = state.responsiveness.get(rt, 0.50)
+        r = responsiveness_get(rt, 0.50)
 
-        ei = gap * r
-        print(f"    EI({rt:15s}) = ({TARGET_ACCURACY:.2f} - {current:.4f}) * {r:.3f} = {ei:.4f}")
+        ei = posterior_ei * r
+        if verbose:
+            print(f"    EI({rt:15s}) = EI({current:.4f} → {TARGET_ACCURACY:.2f}) {posterior_ei:.4f} * {r:.3f} = {ei:.4f}")
 
         if ei > best_ei:
             best_ei = ei
@@ -163,6 +241,9 @@ def run_improvement_loop(
     generate_model: str = "gemini-2.0-flash",
     max_cycles: int | None = None,
     dry_run: bool = False,
+    use_bandit: bool = False,
+    verbose: bool = False,
+    resume: bool = True,
 ):
     """Run the full self-improvement loop.
 
@@ -174,10 +255,34 @@ def run_improvement_loop(
         generate_model: Claude model for data generation.
         max_cycles: Override MAX_CYCLES.
         dry_run: If True, simulate without generating data or retraining.
+            Dry runs neither resume from nor write the loop state.
+        use_bandit: Opt in to picking the (category, failure mode) target
+            with the UCB1 bandit in self_improve.bandit, persisted across
+            runs. By default, use EI over categories and the snapshot's
+            dominant failure mode.
+            Dry runs never write bandit state.
+        verbose: Print the per-category EI breakdown when targeting by EI.
+        resume: If the last run stopped before its final checkpoint, carry
+            over its journaled cycles and responsiveness estimates and
+            continue numbering after its last cycle.
     """
     max_c = max_cycles or MAX_CYCLES
     state = LoopState()
-    state.started_at = datetime.now(timezone.utc).isoformat()
+    first_cycle = 1
+    # Dry runs never read or write loop state, so they can't resume or clobber a real run
+    saved = LoopState.load() if not dry_run else {"cycles": []}
+    if resume and saved["cycles"] and not saved.get("finished_at"):
+        state.prior_cycles = saved["cycles"]
+        state.responsiveness = saved["responsiveness"]
+        state.consecutive_sub_threshold = saved.get("consecutive_sub_threshold", 0)
+        state.started_at = saved.get("started_at", "")
+        first_cycle = max(c["cycle_num"] for c in saved["cycles"]) + 1
+        print(f"Resuming interrupted loop after cycle {first_cycle - 1}")
+    if not state.started_at:
+        state.started_at = datetime.now(timezone.utc).isoformat()
+    # Fold any journaled cycles into a fresh checkpoint before this run appends its own
+    if not dry_run:
+        state.checkpoint()
 
     print("=" * 60)
     print("REDLINE SELF-IMPROVEMENT LOOP")
@@ -192,22 +297,34 @@ def run_improvement_loop(
     state.snapshots.append(baseline)
     print_snapshot(baseline)
 
+    bandit = None
+    if use_bandit:
+        bandit = TargetBandit.load()
+        bandit.seed_prior(baseline, state.responsiveness)
+
     # Main loop
-    for cycle_num in range(1, max_c + 1):
+    for cycle_num in range(first_cycle, max_c + 1):
         print(f"\n{'='*60}")
         print(f"CYCLE {cycle_num}/{max_c}")
         print(f"{'='*60}")
 
         current = state.snapshots[-1]
 
-        # Step 2: Select target category via EI
-        print(f"\n[DIAGNOSE] Computing Expected Improvement...")
-        target_category, ei = select_target_category(current, state)
-        target_accuracy = current.per_type.get(target_category, 0.0)
-        dominant_failure = current.dominant_failure_mode(target_category)
+        # Step 2: Select target category (and failure mode) via the bandit or EI
+        if bandit is not None:
+            print(f"\n[DIAGNOSE] Selecting target via UCB1 over (category, failure mode)...")
+            (target_category, dominant_failure), ucb = bandit.select()
+            target_accuracy = current.per_type.get(target_category, 0.0)
+            print(f"\n  Selected: {target_category} (accuracy={target_accuracy:.4f}, UCB={ucb:.4f})")
+            print(f"  Targeted failure mode: {dominant_failure}")
+        else:
+            print(f"\n[DIAGNOSE] Computing Expected Improvement...")
+            target_category, ei = select_target_category(current, state, verbose=verbose)
+            target_accuracy = current.per_type.get(target_category, 0.0)
+            dominant_failure = current.dominant_failure_mode(target_category)
 
-        print(f"\n  Selected: {target_category} (accuracy={target_accuracy:.4f}, EI={ei:.4f})")
-        print(f"  Dominant failure mode: {dominant_failure}")
+            print(f"\n  Selected: {target_category} (accuracy={target_accuracy:.4f}, EI={ei:.4f})")
+            print(f"  Dominant failure mode: {dominant_failure}")
 
         n_samples = samples_for_cycle(cycle_num)
 
@@ -245,11 +362,14 @@ def run_improvement_loop(
             print("  WARNING: No valid samples generated. Skipping cycle.")
             record.status = "failed"
             state.cycles.append(record)
+            state.append_cycle(record)
             continue
 
         # Step 4: Retrain
         print(f"\n[RETRAIN] Triggering retraining...")
         record.status = "retraining"
+        # Runs created after this are candidates for this cycle's eval; the margin covers clock skew
+        retrain_started = datetime.now(timezone.utc) - timedelta(minutes=5)
 
         if retrain_callback:
             retrain_callback()
@@ -290,17 +410,10 @@ def run_improvement_loop(
                 )
             new_snapshot.composite = compute_composite(new_snapshot)
         else:
-            # Poll W&B for a new finished run (different from the current one)
+            # Poll W&B for a new finished run (different from the current one), 30 minutes max
             print("  Polling W&B for new eval run...")
-            poll_interval = 30
-            max_polls = 60  # 30 minutes max
-            for poll in range(max_polls):
-                time.sleep(poll_interval)
-                new_snapshot = fetch_latest_run()
-                if new_snapshot.run_id != current.run_id:
-                    break
-                print(f"    Waiting for new run... ({poll + 1}/{max_polls})")
-            else:
+            new_snapshot = wait_for_new_run(current.run_id, since=retrain_started, max_wait=1800)
+            if new_snapshot is None:
                 print("  WARNING: No new run appeared. Using latest available.")
                 new_snapshot = fetch_latest_run()
 
@@ -320,10 +433,20 @@ def run_improvement_loop(
         accuracy_before = current.per_type.get(target_category, 0.0)
         accuracy_after = new_snapshot.per_type.get(target_category, 0.0)
         update_responsiveness(state, target_category, accuracy_before, accuracy_after)
+        if bandit is not None:
+            bandit.update((target_category, dominant_failure), accuracy_before, accuracy_after)
+            if not dry_run:
+                bandit.save()
 
         record.status = "complete"
         state.cycles.append(record)
-        state.save()
+        # Count before journaling so a resume keeps its place toward CONVERGENCE_PATIENCE
+        if comparison.converged:
+            state.consecutive_sub_threshold += 1
+        else:
+            state.consecutive_sub_threshold = 0
+        if not dry_run:
+            state.append_cycle(record)
 
         # Step 7: Check stopping criteria
         if comparison.verdict == "abort":
@@ -332,14 +455,11 @@ def run_improvement_loop(
             break
 
         if comparison.converged:
-            state.consecutive_sub_threshold += 1
             print(f"  Sub-threshold cycle ({state.consecutive_sub_threshold}/{CONVERGENCE_PATIENCE})")
             if state.consecutive_sub_threshold >= CONVERGENCE_PATIENCE:
                 state.stop_reason = f"Converged after {cycle_num} cycles (patience={CONVERGENCE_PATIENCE})"
                 print(f"\n  CONVERGED: {CONVERGENCE_PATIENCE} consecutive sub-threshold cycles. Stopping.")
                 break
-        else:
-            state.consecutive_sub_threshold = 0
 
         if not comparison.targeted_category_improved:
             print(f"  WARNING: Targeted category '{target_category}' did not improve enough.")
@@ -349,7 +469,8 @@ def run_improvement_loop(
         print(f"\n  Reached maximum cycles ({max_c}). Stopping.")
 
     state.finished_at = datetime.now(timezone.utc).isoformat()
-    state.save()
+    if not dry_run:
+        state.checkpoint()
 
     # Step 8: Generate report
     print(f"\n{'='*60}")
@@ -379,7 +500,7 @@ def run_improvement_loop(
     print(f"  Report saved to {report_path}")
 
     # Print MCP payload for creating W&B Report
-    payload = get_mcp_report_payload(state.snapshots, completed_comparisons, cycle_metadata)
+    payload = get_mcp_report_payload(state.snapshots, completed_comparisons, cycle_metadata, markdown=markdown)
     print(f"\n  To create W&B Report via MCP, use create_wandb_report_tool with:")
     print(f"    entity_name: {payload['entity_name']}")
     print(f"    project_name: {payload['project_name']}")
@@ -388,7 +509,7 @@ def run_improvement_loop(
     # Try creating via SDK
     try:
         from self_improve.generate_report import create_wandb_report
-        url = create_wandb_report(state.snapshots, completed_comparisons, cycle_metadata)
+        url = create_wandb_report(state.snapshots, completed_comparisons, cycle_metadata, markdown=markdown)
         print(f"\n  W&B Report URL: {url}")
     except Exception as e:
         print(f"\n  Could not create W&B Report via SDK: {e}")
@@ -414,6 +535,9 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="Simulate without generating data or retraining")
     parser.add_argument("--generate-model", default="gemini-2.0-flash", help="Gemini model for data generation")
     parser.add_argument("--no-callbacks", action="store_true", help="Run without HF Jobs callbacks (print instructions instead)")
+    parser.add_argument("--bandit", action="store_true", help="Target (category, failure mode) pairs with the UCB1 bandit instead of EI")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Print the per-category EI breakdown")
+    parser.add_argument("--no-resume", action="store_true", help="Start from cycle 1 even if the last run was interrupted")
     args = parser.parse_args()
 
     eval_cb = None
@@ -430,6 +554,9 @@ def main():
         max_cycles=args.max_cycles,
         dry_run=args.dry_run,
         generate_model=args.generate_model,
+        use_bandit=args.bandit,
+        verbose=args.verbose,
+        resume=not args.no_resume,
     )
 
 
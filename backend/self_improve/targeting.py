@@ -0,0 +1,41 @@
+"""Closed-form Expected Improvement for choosing the next target category.
+
+Per-category accuracy is a proportion measured on n test samples, so its
+posterior is approximately Normal(p_hat, SE) with SE = sqrt(p*(1-p)/n).
+The expected improvement over p_hat toward TARGET_ACCURACY is
+
+    EI = SE * (u * Phi(u) + phi(u)),   u = (target - p_hat) / SE
+
+A category far below target behaves like the plain gap; one close to
+target with a tight estimate scores near zero, while a noisy estimate
+keeps some value because its true accuracy may be lower than measured.
+"""
+
+from __future__ import annotations
+
+from math import erf, exp, pi, sqrt
+
+from self_improve.config import TARGET_ACCURACY
+
+_INV_SQRT_2 = 1.0 / sqrt(2.0)
+_INV_SQRT_2PI = 1.0 / sqrt(2.0 * pi)
+
+
+def _norm_cdf(x: float) -> float:
+    return 0.5 * (1.0 + erf(x * _INV_SQRT_2))
+
+
+def _norm_pdf(x: float) -> float:
+    return _INV_SQRT_2PI * exp(-0.5 * x * x)
+
+
+def expected_improvement(p_hat: float, n: int = 50, target: float = TARGET_ACCURACY) -> float:
+    """Expected improvement of a category at accuracy p_hat over n test samples.
+
+    At p_hat of exactly 0 or 1 the SE is zero and EI reduces to the gap.
+    """
+    se = sqrt(p_hat * (1.0 - p_hat) / n) if 0.0 < p_hat < 1.0 else 0.0
+    if se == 0.0:
+        return max(0.0, target - p_hat)
+    u = (target - p_hat) / se
+    return se * (u * _norm_cdf(u) + _norm_pdf(u))
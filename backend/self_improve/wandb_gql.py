@@ -0,0 +1,140 @@
+"""Minimal W&B GraphQL client for the improvement loop's run listings.
+
+wandb.Api().runs() wraps every run in a Run object and loads each summary
+with its own request. The loop only needs the run ID, display name,
+creation time and a few summary keys, so one query returns them for a
+whole page of runs. Credentials come from WANDB_API_KEY or ~/.netrc, the
+same places the SDK reads them from. requests is imported on first use.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+import orjson
+
+if TYPE_CHECKING:
+    import requests
+
+RUNS_QUERY = """
+query Runs($project: String!, $entity: String!, $first: Int, $after: String, $order: String, $filters: JSONString) {
+    project(name: $project, entityName: $entity) {
+        runs(filters: $filters, first: $first, after: $after, order: $order) {
+            edges {
+                node {
+                    name
+                    displayName
+                    createdAt
+                    summaryMetrics
+                }
+            }
+            pageInfo {
+                endCursor
+                hasNextPage
+            }
+        }
+    }
+}
+"""
+
+# Runs per request when a listing spans several pages
+RUNS_PAGE_SIZE = 50
+
+# Shared session so polls reuse one keep-alive connection
+_SESSION: requests.Session | None = None
+
+
+def _graphql_url() -> str:
+    base_url = os.environ.get("WANDB_BASE_URL", "https://api.wandb.ai")
+    return base_url.rstrip("/") + "/graphql"
+
+
+def _get_session() -> requests.Session:
+    global _SESSION
+    if _SESSION is None:
+        import requests
+
+        _SESSION = requests.Session()
+        api_key = os.environ.get("WANDB_API_KEY")
+        if api_key:
+            _SESSION.auth = ("api", api_key)
+        # Without a key, requests falls back to ~/.netrc (written by `wandb login`)
+    return _SESSION
+
+
+def _query_runs_page(entity: str, project: str, filters: dict, first: int, after: str | None) -> dict:
+    resp = _get_session().post(
+        _graphql_url(),
+        data=orjson.dumps({
+            "query": RUNS_QUERY,
+            "variables": {
+                "entity": entity,
+                "project": project,
+                "first": first,
+                "after": after,
+                "order": "-created_at",
+                "filters": orjson.dumps(filters).decode(),
+            },
+        }),
+        headers={"Content-Type": "application/json"},
+        timeout=30,
+    )
+    resp.raise_for_status()
+    body = orjson.loads(resp.content)
+    if body.get("errors"):
+        raise RuntimeError(f"W&B GraphQL error: {body['errors'][0].get('message', body['errors'])}")
+
+    project_data = (body.get("data") or {}).get("project")
+    if project_data is None:
+        raise ValueError(f"Project {entity}/{project} not found")
+    return project_data["runs"]
+
+
+def fetch_runs(
+    entity: str,
+    project: str,
+    since: datetime | None = None,
+    limit: int | None = RUNS_PAGE_SIZE,
+    keys: tuple[str, ...] | None = None,
+) -> list[dict]:
+    """Finished runs in entity/project, newest first, with their summaries.
+
+    Each run is a dict with id, name, created_at and summary, named like
+    the SDK's Run attributes. since keeps only runs created after it; keys
+    limits each summary to those keys. The API returns whole summaries, so
+    the projection happens here. At most limit runs are returned; with
+    limit=None every page is fetched, RUNS_PAGE_SIZE runs per request.
+    """
+    filters: dict = {"state": "finished"}
+    if since is not None:
+        # W&B stores createdAt as naive UTC
+        filters["createdAt"] = {"$gt": since.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")}
+
+    edges = []
+    cursor = None
+    while True:
+        first = RUNS_PAGE_SIZE if limit is None else min(RUNS_PAGE_SIZE, limit - len(edges))
+        page = _query_runs_page(entity, project, filters, first, cursor)
+        edges.extend(page["edges"])
+        page_info = page.get("pageInfo") or {}
+        if not page_info.get("hasNextPage") or (limit is not None and len(edges) >= limit):
+            break
+        cursor = page_info["endCursor"]
+
+    runs = []
+    for edge in edges:
+        node = edge["node"]
+        summary = node.get("summaryMetrics") or {}
+        if isinstance(summary, str):
+            summary = orjson.loads(summary)
+        if keys is not None:
+            summary = {k: summary[k] for k in keys if k in summary}
+        runs.append({
+            "id": node["name"],
+            "name": node["displayName"],
+            "created_at": node["createdAt"],
+            "summary": summary,
+        })
+    return runs
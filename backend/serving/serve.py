@@ -11,10 +11,34 @@ from pathlib import Path
 
 import yaml
 
+# libyaml's C loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# vLLM flag -> (section, key) in the serving config, in command-line order
+_VLLM_ARG_MAP = (
+    ("--model", ("server", "base_model")),
+    ("--host", ("server", "host")),
+    ("--port", ("server", "port")),
+    ("--tensor-parallel-size", ("server", "tensor_parallel_size")),
+    ("--max-model-len", ("server", "max_model_len")),
+    ("--gpu-memory-utilization", ("server", "gpu_memory_utilization")),
+    ("--max-num-seqs", ("batching", "max_num_seqs")),
+    ("--max-num-batched-tokens", ("batching", "max_num_batched_tokens")),
+)
+
 
 def load_config(config_path: str = "serving/config.yaml") -> dict:
     with open(config_path) as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_YAML_LOADER)
+
+
+def build_vllm_args(cfg: dict) -> list[str]:
+    """vLLM server arguments from the serving config, with the LoRA adapter enabled."""
+    args = []
+    for flag, (section, key) in _VLLM_ARG_MAP:
+        args += (flag, str(cfg[section][key]))
+    args += ("--enable-lora", "--lora-modules", f"redline-extractor={cfg['server']['model']}")
+    return args
 
 
 def main():
@@ -24,30 +48,26 @@ def main():
 
     cfg = load_config(args.config)
 
-    vllm_args = [
-        "--model", cfg["server"]["base_model"],
-        "--host", cfg["server"]["host"],
-        "--port", str(cfg["server"]["port"]),
-        "--tensor-parallel-size", str(cfg["server"]["tensor_parallel_size"]),
-        "--max-model-len", str(cfg["server"]["max_model_len"]),
-        "--gpu-memory-utilization", str(cfg["server"]["gpu_memory_utilization"]),
-        "--max-num-seqs", str(cfg["batching"]["max_num_seqs"]),
-        "--max-num-batched-tokens", str(cfg["batching"]["max_num_batched_tokens"]),
-        "--enable-lora",
-        "--lora-modules", f"redline-extractor={cfg['server']['model']}",
-    ]
+    vllm_args = build_vllm_args(cfg)
 
     print(f"Starting vLLM server...")
     print(f"Base model: {cfg['server']['base_model']}")
     print(f"LoRA adapter: {cfg['server']['model']}")
     print(f"Port: {cfg['server']['port']}")
 
-    import subprocess
+    import os
     import sys
 
     cmd = [sys.executable, "-m", "vllm.entrypoints.openai.api_server"] + vllm_args
-    print(f"\nLaunching: {' '.join(cmd)}")
-    subprocess.run(cmd)
+    print(f"\nLaunching: {' '.join(cmd)}", flush=True)
+    if os.name == "nt":
+        import subprocess
+
+        subprocess.run(cmd)
+    else:
+        # Replace this process with vLLM: no idle parent holding memory,
+        # and signals reach the server directly.
+        os.execvp(sys.executable, cmd)
 
 
 if __name__ == "__main__":
@@ -7,46 +7,225 @@ Logs everything to W&B Models.
 from __future__ import annotations
 
 import argparse
-import json
+import os
+import shutil
+from collections.abc import Iterator
 from pathlib import Path
 
-import yaml
+import orjson
+
+# Mistral instruct markup used by format_for_sft
+_BOS_INST = "<s>[INST] "
+_END_INST = " [/INST]"
+_EOS = "</s>"
+
+# Keys in the config's training section that go to SFTTrainer, not TrainingArguments
+_SFT_TRAINER_KEYS = frozenset({"packing"})
+
+# Rows per batch when formatting datasets for SFT
+SFT_MAP_BATCH_SIZE = 1000
+
+
+def _config_cache_path(config_path: Path) -> Path:
+    return config_path.with_suffix(config_path.suffix + ".cache.json")
 
 
 def load_config(config_path: str = "training/config.yaml") -> dict:
-    with open(config_path) as f:
-        return yaml.safe_load(f)
+    """Load the training config, via a JSON copy next to the YAML when it is fresh.
+
+    The copy is rewritten whenever the YAML is newer than it. PyYAML is
+    only imported on that path, so a run with a fresh copy never loads it.
+    """
+    path = Path(config_path)
+    cache = _config_cache_path(path)
+    try:
+        if cache.stat().st_mtime >= path.stat().st_mtime:
+            return orjson.loads(cache.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        pass  # no cache yet, or unreadable; fall back to the YAML
 
+    import yaml
 
-def load_jsonl_dataset(path: str) -> list[dict]:
-    samples = []
+    # libyaml's C loader when PyYAML was built with it, pure-Python otherwise
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     with open(path) as f:
+        cfg = yaml.load(f, Loader=loader)
+    try:
+        tmp = cache.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(orjson.dumps(cfg))
+        os.replace(tmp, cache)
+    except (OSError, TypeError):
+        pass  # caching is best-effort; e.g. read-only checkout or non-JSON YAML values
+    return cfg
+
+
+def iter_jsonl_dataset(path: str) -> Iterator[dict]:
+    """Decode a JSONL file one line at a time, for passes that don't need the whole list."""
+    with open(path, "rb") as f:
         for line in f:
-            line = line.strip()
-            if line:
-                samples.append(json.loads(line))
-    return samples
+            if not line.isspace():
+                yield orjson.loads(line)
+
+
+def count_jsonl_records(path: str) -> int:
+    """Number of non-blank lines in a JSONL file, without decoding any of them."""
+    with open(path, "rb") as f:
+        return sum(1 for line in f if not line.isspace())
 
 
 def format_for_sft(sample: dict) -> str:
     """Convert a chat-format sample to Mistral instruct format."""
     messages = sample.get("messages", [])
     parts = []
+    append = parts.append
     for msg in messages:
         role = msg["role"]
         content = msg["content"]
+        if content.__class__ is not str:
+            content = f"{content}"  # as the f-string formatting did, e.g. None -> "None"
         if role == "system":
-            parts.append(f"<s>[INST] {content}\n")
+            append(_BOS_INST)
+            append(content)
+            append("\n")
         elif role == "user":
-            if parts:
-                parts[-1] += f"{content} [/INST]"
-            else:
-                parts.append(f"<s>[INST] {content} [/INST]")
+            # After a system prompt (or earlier turns) the [INST] is already open
+            if not parts:
+                append(_BOS_INST)
+            append(content)
+            append(_END_INST)
         elif role == "assistant":
-            parts.append(f"{content}</s>")
+            append(content)
+            append(_EOS)
     return "".join(parts)
 
 
+def format_for_sft_arrow(messages):
+    """format_for_sft over a whole Arrow list<struct<role, content>> column.
+
+    Every message becomes prefix + content + suffix using pyarrow.compute
+    kernels, and each sample's pieces are joined with binary_join, so no
+    per-message Python runs. A user turn opens "<s>[INST] " only when no
+    system/user/assistant message precedes it in its sample, matching
+    format_for_sft. Returns a StringArray, one entry per sample.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if isinstance(messages, pa.ChunkedArray):
+        messages = messages.combine_chunks()
+    flat = messages.flatten()
+    role = flat.field("role")
+    content = flat.field("content")
+    if content.type != pa.string():
+        content = pc.cast(content, pa.string())
+
+    is_system = pc.fill_null(pc.equal(role, "system"), False)
+    is_user = pc.fill_null(pc.equal(role, "user"), False)
+    is_assistant = pc.fill_null(pc.equal(role, "assistant"), False)
+    known = pc.or_(pc.or_(is_system, is_user), is_assistant)
+
+    # Known messages before each one within its own sample: an exclusive running
+    # count over the flattened column, minus the count where the sample starts
+    known_n = pc.cast(known, pa.int64())
+    before = pc.subtract(pc.cumulative_sum(known_n), known_n)
+    offsets = pc.subtract(messages.offsets, messages.offsets[0])
+    sample_start = pc.take(offsets[:-1], pc.list_parent_indices(messages))
+    opens = pc.and_(is_user, pc.equal(pc.subtract(before, pc.take(before, sample_start)), 0))
+
+    prefix = pc.if_else(pc.or_(is_system, opens), _BOS_INST, "")
+    suffix = pc.case_when(
+        pc.make_struct(is_system, is_user, is_assistant),
+        "\n", _END_INST, _EOS, "",
+    )
+    body = pc.if_else(known, pc.fill_null(content, "None"), "")  # f"{None}" in format_for_sft
+    pieces = pc.binary_join_element_wise(prefix, body, suffix, "")
+    return pc.binary_join(pa.ListArray.from_arrays(offsets, pieces), "")
+
+
+def format_for_sft_table(batch):
+    """Batched Dataset.map function over Arrow tables: messages column in, text column out."""
+    import pyarrow as pa
+
+    return pa.table({"text": format_for_sft_arrow(batch["messages"])})
+
+
+def load_arrow_dataset(path: str):
+    """Load a JSONL file as a memory-mapped datasets.Dataset via an Arrow copy beside it.
+
+    data/train.jsonl is cached as the data/train.arrow/ directory. The copy
+    is rebuilt with Dataset.from_json (pyarrow's JSON reader) when missing or
+    older than the JSONL; otherwise it opens without parsing anything.
+    """
+    from datasets import Dataset
+
+    src = Path(path)
+    cache = src.with_suffix(".arrow")
+    # save_to_disk writes state.json last, so its presence marks a complete copy
+    marker = cache / "state.json"
+    try:
+        if marker.stat().st_mtime >= src.stat().st_mtime:
+            return Dataset.load_from_disk(str(cache))
+    except FileNotFoundError:
+        pass
+
+    raw = Dataset.from_json(str(src))
+    shutil.rmtree(cache, ignore_errors=True)  # drop stale shards and map caches
+    raw.save_to_disk(str(cache))
+    return Dataset.load_from_disk(str(cache))
+
+
+def build_sft_dataset(path: str):
+    """Load a chat JSONL straight into a datasets.Dataset of formatted text.
+
+    Samples go JSONL -> Arrow (cached, see load_arrow_dataset) without a
+    list of dicts in between. Formatting runs on Arrow batches with
+    format_for_sft_table, in parallel worker processes for large files.
+    """
+    raw = load_arrow_dataset(path)
+    # One worker per SFT_MAP_BATCH_SIZE rows, up to the core count; small
+    # files aren't worth the process startup
+    num_proc = min(os.cpu_count() or 1, len(raw) // SFT_MAP_BATCH_SIZE)
+    formatted = raw.with_format("arrow").map(
+        format_for_sft_table,
+        batched=True,
+        batch_size=SFT_MAP_BATCH_SIZE,
+        num_proc=num_proc if num_proc > 1 else None,
+        remove_columns=raw.column_names,
+    )
+    return formatted.with_format(None)
+
+
+def tokenize_sft_dataset(path: str, dataset, tokenizer, max_seq_length: int):
+    """Tokenize a formatted SFT dataset once and keep the result beside the Arrow copy.
+
+    The token ids are saved under the JSONL's .arrow directory, keyed by
+    tokenizer and max length, and memory-mapped on later runs. Rebuilding
+    the Arrow copy (the JSONL changed) removes them with it. Tokenization
+    matches SFTTrainer's own for unpacked data: truncate to max_seq_length,
+    no padding. Ids are stored as int32 and the mask as int8 rather than
+    int64, which shrinks the cache 2-8x; the collator builds int64 tensors
+    either way.
+    """
+    from datasets import Dataset, Sequence, Value
+
+    tag = f"{tokenizer.name_or_path.replace('/', '--')}-{max_seq_length}"
+    cache = Path(path).with_suffix(".arrow") / f"tokenized-{tag}"
+    if (cache / "state.json").exists():
+        return Dataset.load_from_disk(str(cache))
+
+    tokenized = dataset.map(
+        lambda batch: tokenizer(batch["text"], truncation=True, padding=False, max_length=max_seq_length),
+        batched=True,
+        batch_size=SFT_MAP_BATCH_SIZE,
+        remove_columns=["text"],
+    )
+    tokenized = tokenized.cast_column("input_ids", Sequence(Value("int32")))
+    tokenized = tokenized.cast_column("attention_mask", Sequence(Value("int8")))
+    shutil.rmtree(cache, ignore_errors=True)  # a partial earlier write
+    tokenized.save_to_disk(str(cache))
+    return Dataset.load_from_disk(str(cache))
+
+
 def main():
     parser = argparse.ArgumentParser(description="Fine-tune Mistral for Redline extraction")
     parser.add_argument("--config", default="training/config.yaml", help="Config YAML path")
@@ -58,24 +237,37 @@ def main():
     print(f"  LoRA rank: {cfg['lora']['rank']}, alpha: {cfg['lora']['alpha']}")
     print(f"  Epochs: {cfg['training']['num_train_epochs']}, LR: {cfg['training']['learning_rate']}")
 
-    # Load data
-    train_data = load_jsonl_dataset(cfg["data"]["train_path"])
-    val_data = load_jsonl_dataset(cfg["data"]["val_path"])
-    print(f"  Train: {len(train_data)} samples, Val: {len(val_data)} samples")
-
     if args.dry_run:
+        # Decode only the first record of each file; the rest are just counted
+        train_path, val_path = cfg["data"]["train_path"], cfg["data"]["val_path"]
+        first_train = next(iter_jsonl_dataset(train_path), None)
+        first_val = next(iter_jsonl_dataset(val_path), None)
+        print(f"  Train: {count_jsonl_records(train_path)} samples, Val: {count_jsonl_records(val_path)} samples")
+        if first_val is None:
+            print(f"  Note: {val_path} is empty")
         print("\nDry run — config and data validated. Exiting.")
-        formatted = format_for_sft(train_data[0])
+        if first_train is None:
+            print(f"\n{train_path} is empty; no sample to format.")
+            return
+        formatted = format_for_sft(first_train)
         print(f"\nSample formatted input (first 300 chars):\n{formatted[:300]}...")
         return
 
+    # Let the Rust tokenizer batch-encode on all cores. The only forked workers
+    # (dataset formatting) run before the tokenizer is first used.
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
+
     # GPU-dependent imports
     from unsloth import FastLanguageModel
     from trl import SFTTrainer
     from transformers import TrainingArguments
-    from datasets import Dataset
     import wandb
 
+    # Load and format data before touching W&B or the GPU
+    train_dataset = build_sft_dataset(cfg["data"]["train_path"])
+    val_dataset = build_sft_dataset(cfg["data"]["val_path"])
+    print(f"  Train: {len(train_dataset)} samples, Val: {len(val_dataset)} samples")
+
     # Initialize W&B
     wandb.init(
         project=cfg["wandb"]["project"],
@@ -102,38 +294,21 @@ def main():
         use_gradient_checkpointing="unsloth",
     )
 
-    # Prepare datasets
-    train_texts = [format_for_sft(s) for s in train_data]
-    val_texts = [format_for_sft(s) for s in val_data]
-
-    train_dataset = Dataset.from_dict({"text": train_texts})
-    val_dataset = Dataset.from_dict({"text": val_texts})
-
-    # Training arguments
-    training_args = TrainingArguments(
-        output_dir=cfg["training"]["output_dir"],
-        num_train_epochs=cfg["training"]["num_train_epochs"],
-        per_device_train_batch_size=cfg["training"]["per_device_train_batch_size"],
-        gradient_accumulation_steps=cfg["training"]["gradient_accumulation_steps"],
-        learning_rate=cfg["training"]["learning_rate"],
-        lr_scheduler_type=cfg["training"]["lr_scheduler_type"],
-        warmup_ratio=cfg["training"]["warmup_ratio"],
-        weight_decay=cfg["training"]["weight_decay"],
-        max_grad_norm=cfg["training"]["max_grad_norm"],
-        fp16=cfg["training"]["fp16"],
-        bf16=cfg["training"]["bf16"],
-        logging_steps=cfg["training"]["logging_steps"],
-        eval_strategy=cfg["training"]["eval_strategy"],
-        eval_steps=cfg["training"]["eval_steps"],
-        save_strategy=cfg["training"]["save_strategy"],
-        save_steps=cfg["training"]["save_steps"],
-        save_total_limit=cfg["training"]["save_total_limit"],
-        seed=cfg["training"]["seed"],
-        report_to="wandb",
-        push_to_hub=cfg["hub"]["push_to_hub"],
-        hub_model_id=cfg["hub"]["hub_model_id"],
-        hub_strategy=cfg["hub"]["hub_strategy"],
-    )
+    # Without packing, SFTTrainer would tokenize the text on every run; hand it
+    # cached token ids instead. Packing needs the text, so leave it as is.
+    if not cfg["training"]["packing"]:
+        max_len = cfg["model"]["max_seq_length"]
+        train_dataset = tokenize_sft_dataset(cfg["data"]["train_path"], train_dataset, tokenizer, max_len)
+        val_dataset = tokenize_sft_dataset(cfg["data"]["val_path"], val_dataset, tokenizer, max_len)
+
+    # Training arguments: the training and hub sections use TrainingArguments'
+    # field names, minus the keys that belong to SFTTrainer
+    training_kwargs = {k: v for k, v in cfg["training"].items() if k not in _SFT_TRAINER_KEYS}
+    if not cfg["training"]["packing"]:
+        # Unpacked batches are padded to their longest row; batch rows of
+        # similar length (read from the cached input_ids) to cut pad tokens
+        training_kwargs.setdefault("group_by_length", True)
+    training_args = TrainingArguments(**training_kwargs, **cfg["hub"], report_to="wandb")
 
     # SFT Trainer
     trainer = SFTTrainer(
@@ -171,7 +346,9 @@ def main():
         type="model",
         description="LoRA adapter for compliance extraction",
     )
-    artifact.add_dir(str(output_dir / "final_adapter"))
+    # The adapter files aren't touched again, so upload them in place instead
+    # of staging a copy, and keep them out of the local artifact cache
+    artifact.add_dir(str(output_dir / "final_adapter"), skip_cache=True, policy="immutable")
     wandb.log_artifact(artifact)
     wandb.finish()
     print("Training complete.")